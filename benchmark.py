@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Faster-Whisper SRT Converter.
+
+Usage:
+    python benchmark.py batch [--model tiny] [--audio FILE] [--batch-size 8] [--repeat 2]
+    python benchmark.py pipeline [--files 20] [--seconds 60] [--rtf 0] [--windowed-audio] [--guard]
+    python benchmark.py affinity [--model tiny] [--audio FILE] [--jobs 4]
+
+The bundled Colony_Counter_demo.mp3 is used when no audio file is given.
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import faster_whisper_srt
+
+DEFAULT_AUDIO = Path(__file__).resolve().parent / "Colony_Counter_demo.mp3"
+
+
+def timed_transcription(audio_path, model, model_name, repeat=1, **kwargs):
+    """
+    Run transcribe_and_build_srt `repeat` times with output silenced.
+    Returns: (best wall seconds, SRT content)
+    """
+    best = None
+    srt = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            srt = faster_whisper_srt.transcribe_and_build_srt(
+                audio_path=str(audio_path),
+                model=model,
+                model_name=model_name,
+                progress_callback=lambda current, total: None,
+                **kwargs,
+            )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, srt
+
+
+def print_results(results, audio_seconds):
+    """Print a comparison table. results: list of (label, wall_seconds, cue_count)."""
+    baseline = results[0][1]
+    print(f"\n{'Mode':<22} {'Wall s':>8} {'RTF':>7} {'x Realtime':>11} {'Speedup':>8} {'Cues':>6}")
+    print("-" * 66)
+    for label, wall, cues in results:
+        rtf = wall / audio_seconds if audio_seconds else 0.0
+        realtime = audio_seconds / wall if wall else 0.0
+        print(
+            f"{label:<22} {wall:>8.2f} {rtf:>7.3f} {realtime:>10.1f}x "
+            f"{baseline / wall:>7.2f}x {cues:>6}"
+        )
+
+
+def count_cues(srt: str) -> int:
+    return srt.count(" --> ")
+
+
+def bench_batch(args):
+    """Sequential vs batched decoding of one file with the same model."""
+    audio = Path(args.audio)
+    audio_seconds = faster_whisper_srt.get_audio_duration(str(audio))
+    print(f"[*] Audio: {audio.name} ({audio_seconds:.1f}s), model: {args.model}")
+
+    model = faster_whisper_srt.load_engine(args.model)
+    batch_size = faster_whisper_srt.resolve_batch_size(args.batch_size, args.model)
+
+    # Warm-up so neither mode pays for first-call initialisation
+    timed_transcription(audio, model, args.model)
+
+    results = []
+    wall, srt = timed_transcription(audio, model, args.model, repeat=args.repeat)
+    results.append(("sequential", wall, count_cues(srt)))
+    wall, srt = timed_transcription(
+        audio, model, args.model, repeat=args.repeat, batch_size=batch_size
+    )
+    results.append((f"batched (size {batch_size})", wall, count_cues(srt)))
+
+    print_results(results, audio_seconds)
+
+
+def write_test_wav(path, seconds, sample_rate=16000, channels=1):
+    """Write a deterministic low-level noise WAV (no external tools needed)."""
+    frame_bytes = bytes((i * 37) % 16 for i in range(sample_rate * channels * 2))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        whole, part = divmod(seconds, 1)
+        for _ in range(int(whole)):
+            w.writeframes(frame_bytes)
+        w.writeframes(frame_bytes[:int(part * sample_rate) * channels * 2])
+
+
+def bench_pipeline(args):
+    """
+    Throughput of our own pipeline (probing, reading, splitting, formatting,
+    writing) with the synthetic engine standing in for the model.
+    """
+    engine = faster_whisper_srt.SyntheticEngine(
+        rtf=args.rtf, segment_seconds=args.segment_seconds, chars=args.chars
+    )
+    work_dir = Path(tempfile.mkdtemp(prefix="fwsrt_bench_"))
+    try:
+        inputs = []
+        for i in range(args.files):
+            path = work_dir / f"clip_{i:04d}.wav"
+            write_test_wav(path, args.seconds)
+            inputs.append(path)
+
+        options = {"windowed_audio": args.windowed_audio, "guard": args.guard}
+        per_file = []
+        cues = 0
+        start = time.perf_counter()
+        for path in inputs:
+            file_start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                faster_whisper_srt.process_file(
+                    path, engine, "synthetic", args.max_chars,
+                    progress_callback=lambda current, total: None,
+                    **options,
+                )
+            per_file.append(time.perf_counter() - file_start)
+            cues += count_cues((work_dir / f"{path.stem}_synthetic.srt").read_text(encoding="utf-8"))
+        total = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    per_file.sort()
+    audio_seconds = args.files * args.seconds
+    enabled = [name for name, on in options.items() if on] or ["default"]
+    print(f"[*] Pipeline benchmark: {args.files} x {args.seconds:g}s WAV, "
+          f"engine rtf {args.rtf:g}, options: {', '.join(enabled)}")
+    print(f"    Total wall:      {total:.2f}s ({args.files / total:.1f} files/s)")
+    print(f"    Per file:        median {per_file[len(per_file) // 2] * 1000:.1f} ms, "
+          f"max {per_file[-1] * 1000:.1f} ms")
+    print(f"    Audio processed: {audio_seconds / total:.0f}x realtime")
+    print(f"    Cues written:    {cues} ({cues / total:.0f} cues/s)")
+
+
+def run_concurrent_jobs(inputs, base_args, pinned):
+    """Run one CLI process per input at the same time. Returns wall seconds."""
+    script = Path(faster_whisper_srt.__file__).resolve()
+    jobs = len(inputs)
+    procs = []
+    start = time.perf_counter()
+    for slot, path in enumerate(inputs):
+        cmd = [sys.executable, str(script), str(path), *base_args]
+        if pinned:
+            cmd += ["--cpu-slot", f"{slot}/{jobs}"]
+        procs.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    failed = sum(proc.wait() != 0 for proc in procs)
+    wall = time.perf_counter() - start
+    if failed:
+        print(f"[!] {failed} of {jobs} jobs failed")
+    return wall
+
+
+def bench_affinity(args):
+    """Aggregate throughput of N side-by-side jobs, unpinned vs one CPU slot each."""
+    audio = Path(args.audio)
+    audio_seconds = faster_whisper_srt.get_audio_duration(str(audio))
+    cpus = len(faster_whisper_srt.available_cpus())
+    if args.jobs > cpus:
+        print(f"[!] {args.jobs} jobs need at least {args.jobs} CPUs ({cpus} available).")
+        return 1
+    print(f"[*] {args.jobs} concurrent jobs on {cpus} CPUs, "
+          f"audio: {audio.name} ({audio_seconds:.1f}s), model: {args.model}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="fwsrt_bench_"))
+    try:
+        inputs = []
+        for i in range(args.jobs):
+            path = work_dir / f"job_{i}{audio.suffix}"
+            shutil.copyfile(audio, path)
+            inputs.append(path)
+        base_args = ["--model", args.model, "--engine", args.engine]
+
+        # Warm-up so the model is downloaded and in the page cache for both modes
+        run_concurrent_jobs(inputs[:1], base_args, pinned=False)
+
+        rows = []
+        for label, pinned in (("unpinned", False), (f"pinned ({cpus // args.jobs} CPUs/job)", True)):
+            wall = min(run_concurrent_jobs(inputs, base_args, pinned) for _ in range(args.repeat))
+            rows.append((label, wall))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total_audio = audio_seconds * args.jobs
+    baseline = rows[0][1]
+    print(f"\n{'Mode':<26} {'Wall s':>8} {'Audio s/s':>10} {'Speedup':>8}")
+    print("-" * 55)
+    for label, wall in rows:
+        print(f"{label:<26} {wall:>8.2f} {total_audio / wall:>10.1f} {baseline / wall:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faster-Whisper SRT Converter benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    p_batch = subparsers.add_parser("batch", help="Sequential vs batched decoding throughput.")
+    p_batch.add_argument("--audio", default=str(DEFAULT_AUDIO), help="Audio file to transcribe.")
+    p_batch.add_argument("--model", default="tiny", choices=faster_whisper_srt.VALID_MODELS)
+    p_batch.add_argument(
+        "--batch-size",
+        type=faster_whisper_srt.parse_batch_size,
+        default="auto",
+        help="Batch size for the batched run (default: auto).",
+    )
+    p_batch.add_argument("--repeat", type=int, default=2, help="Runs per mode; best is kept.")
+    p_batch.set_defaults(func=bench_batch)
+
+    p_pipe = subparsers.add_parser(
+        "pipeline", help="Pipeline overhead with the synthetic engine (no model needed)."
+    )
+    p_pipe.add_argument("--files", type=int, default=20, help="Number of generated WAV files.")
+    p_pipe.add_argument("--seconds", type=float, default=60.0, help="Length of each file.")
+    p_pipe.add_argument("--rtf", type=float, default=0.0, help="Simulated engine real-time factor.")
+    p_pipe.add_argument("--segment-seconds", type=float, default=4.0, help="Synthetic segment length.")
+    p_pipe.add_argument("--chars", type=int, default=20, help="Characters per synthetic segment.")
+    p_pipe.add_argument("--max-chars", type=int, default=40, help="Maximum characters per cue.")
+    p_pipe.add_argument("--windowed-audio", action="store_true", help="Use the windowed PCM reader.")
+    p_pipe.add_argument("--guard", action="store_true", help="Enable the decode-loop guard.")
+    p_pipe.set_defaults(func=bench_pipeline)
+
+    p_aff = subparsers.add_parser(
+        "affinity", help="Side-by-side jobs with and without --cpu-slot pinning."
+    )
+    p_aff.add_argument("--audio", default=str(DEFAULT_AUDIO), help="Audio file each job transcribes.")
+    p_aff.add_argument("--model", default="tiny", choices=faster_whisper_srt.VALID_MODELS)
+    p_aff.add_argument("--engine", default="faster-whisper", help="Engine spec passed to each job.")
+    p_aff.add_argument(
+        "--jobs",
+        type=int,
+        default=max(1, min(4, len(faster_whisper_srt.available_cpus()))),
+        help="Concurrent jobs (default: up to 4).",
+    )
+    p_aff.add_argument("--repeat", type=int, default=1, help="Runs per mode; best is kept.")
+    p_aff.set_defaults(func=bench_affinity)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
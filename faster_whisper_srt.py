@@ -12,6 +12,14 @@ Examples:
     python faster_whisper_srt.py demo.mp3
     python faster_whisper_srt.py demo.mp4 --model large-v3-turbo
     python faster_whisper_srt.py demo.wav --max-chars 30
+    python faster_whisper_srt.py demo.mp4 --trim-silence
+    python faster_whisper_srt.py long_recording.mp3 --windowed-audio
+    python faster_whisper_srt.py movie.mkv --audio-tracks eng,jpn
+    python faster_whisper_srt.py demo.mp3 --model tiny,small,medium
+    python faster_whisper_srt.py watch D:\\Recordings --model small
+    python faster_whisper_srt.py stream demo.mp3 --realtime --latency 3 --format both
+    python faster_whisper_srt.py enqueue /mnt/share/queue /mnt/share/archive/*.mp3
+    python faster_whisper_srt.py worker /mnt/share/queue --model small
 
 Available Models:
     tiny, tiny.en, base, base.en, small, small.en,
@@ -19,6 +27,8 @@ Available Models:
 """
 
 import argparse
+import asyncio
+import bisect
 import os
 import shutil
 import subprocess
@@ -27,8 +37,12 @@ import tempfile
 import threading
 import time
 import warnings
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import timedelta
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Protocol
 
 # Suppress noisy huggingface_hub warnings (symlinks + unauthenticated requests)
 # These are harmless for local use and clutter the terminal output.
@@ -44,6 +58,88 @@ AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".aac", ".wma"}
 VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".mov", ".webm", ".flv"}
 SUPPORTED_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
 
+# Whisper models expect 16 kHz mono input
+SAMPLE_RATE = 16000
+
+# Window length for the windowed PCM reader (--windowed-audio). Only one window
+# is converted to float32 at a time; cuts are moved to the quietest point
+# within the last PCM_CUT_SEARCH_SECONDS to avoid splitting words.
+PCM_WINDOW_SECONDS = 600
+PCM_CUT_SEARCH_SECONDS = 5
+
+# Watch-folder mode: a file is considered fully copied once its size has not
+# changed for WATCH_SETTLE_SECONDS. Polling is only used when the optional
+# `watchdog` package (inotify / FSEvents / ReadDirectoryChangesW) is missing.
+WATCH_SETTLE_SECONDS = 2.0
+WATCH_POLL_INTERVAL = 2.0
+WATCH_STATE_FILENAME = ".faster_whisper_srt_state.json"
+
+# Live streaming mode: audio is decoded in a sliding window of at most
+# STREAM_MAX_WINDOW_SECONDS. --latency sets how quickly cues are finalized;
+# the decode step and the lookahead kept for revision are derived from it.
+STREAM_DEFAULT_LATENCY = 5.0
+STREAM_MAX_WINDOW_SECONDS = 30.0
+STREAM_READ_SECONDS = 0.25
+STREAM_STDERR_LINES = 20
+
+# Per-job resource accounting. History of peak memory per model is kept
+# between runs and used by --max-rss to refuse or delay jobs.
+RESOURCE_SAMPLE_INTERVAL = 0.5
+RESOURCE_HISTORY_PATH = Path.home() / ".cache" / "faster-whisper-srt" / "resource_history.json"
+
+# Batched decoding (--batch-size). "auto" sizes batches to use at most half of
+# the free memory, assuming roughly this many MB per in-flight 30 s window.
+BATCH_ITEM_MB = {
+    "tiny": 64, "tiny.en": 64,
+    "base": 64, "base.en": 64,
+    "small": 80, "small.en": 80,
+    "medium": 150, "medium.en": 150,
+    "large-v1": 310, "large-v2": 310, "large-v3": 310,
+    "large-v3-turbo": 200,
+}
+MAX_AUTO_BATCH_SIZE = 16
+
+# Model cascade (--cascade FAST_MODEL): segments from the fast model that look
+# unreliable are re-decoded by --model. A segment escalates if its average
+# log-probability is below the threshold, its text is overly repetitive
+# (compression ratio), or it was emitted despite a likely no-speech window.
+CASCADE_LOGPROB_THRESHOLD = -0.8
+CASCADE_COMPRESSION_THRESHOLD = 2.4
+CASCADE_NO_SPEECH_THRESHOLD = 0.6
+CASCADE_PAD_SECONDS = 0.5
+CASCADE_MERGE_GAP_SECONDS = 1.0
+
+# Decode-loop guard (--guard / --time-budget). Segments whose text repeats an
+# n-gram GUARD_NGRAM_REPEATS times in a row (single characters:
+# GUARD_CHAR_REPEATS), or whose compression ratio exceeds GUARD_MAX_COMPRESSION,
+# are dropped and the rest of the audio is re-decoded with cheaper settings.
+# A window is "slow" when it costs GUARD_SLOW_FACTOR times the running
+# real-time factor (and at least GUARD_MIN_SLOW_SECONDS of wall time).
+# faster-whisper yields a whole window's (or batch's) segments at once, so
+# segments arriving within GUARD_BURST_SECONDS of each other are costed
+# together: the wall gap before the burst against all the audio it covers.
+GUARD_NGRAM_MAX = 8
+GUARD_NGRAM_REPEATS = 4
+GUARD_CHAR_REPEATS = 10
+GUARD_MAX_COMPRESSION = 3.0
+GUARD_SLOW_FACTOR = 4.0
+GUARD_MIN_SLOW_SECONDS = 10.0
+GUARD_WARMUP_SECONDS = 30.0
+GUARD_BURST_SECONDS = 0.05
+
+# Shared work queue (enqueue / worker). A worker owns a job while its lease
+# file keeps being touched; leases untouched for QUEUE_LEASE_SECONDS are
+# considered abandoned (crashed worker) and reclaimed. Lease ages are measured
+# against the shared filesystem's clock, not the local one.
+QUEUE_LEASE_SECONDS = 120.0
+QUEUE_HEARTBEAT_SECONDS = 15.0
+QUEUE_POLL_INTERVAL = 5.0
+QUEUE_MAX_ATTEMPTS = 3
+
+# Async API (AsyncTranscriber): cues buffered per job before its decode thread
+# waits for the consumer to catch up.
+ASYNC_BUFFER_CUES = 32
+
 VALID_MODELS = [
     "tiny", "tiny.en",
     "base", "base.en",
@@ -63,6 +159,24 @@ MODEL_SIZES_MB = {
     "large-v3-turbo": 1600,
 }
 
+# ---------------------------------------------------------------------------
+# Errors
+# ---------------------------------------------------------------------------
+
+
+class TranscriptionError(Exception):
+    """Base class for errors raised by the library functions.
+    The CLI prints the message and exits with status 1."""
+
+
+class MissingDependencyError(TranscriptionError):
+    """A required external tool or package is not installed."""
+
+
+class AudioExtractionError(TranscriptionError):
+    """ffmpeg failed to extract audio from an input file."""
+
+
 # ---------------------------------------------------------------------------
 # Environment Checks
 # ---------------------------------------------------------------------------
@@ -71,10 +185,11 @@ MODEL_SIZES_MB = {
 def check_ffmpeg():
     """Check if FFmpeg is available on the system."""
     if shutil.which("ffmpeg") is None:
-        print("[!] FFmpeg is not installed.")
-        print("    Windows:  winget install --id Gyan.FFmpeg --source winget")
-        print("    macOS:    brew install ffmpeg")
-        sys.exit(1)
+        raise MissingDependencyError(
+            "FFmpeg is not installed.\n"
+            "    Windows:  winget install --id Gyan.FFmpeg --source winget\n"
+            "    macOS:    brew install ffmpeg"
+        )
 
 
 def check_faster_whisper():
@@ -82,9 +197,10 @@ def check_faster_whisper():
     try:
         from faster_whisper import WhisperModel  # noqa: F401
     except ImportError:
-        print("[!] faster-whisper is not installed.")
-        print("    Install with: pip install faster-whisper")
-        sys.exit(1)
+        raise MissingDependencyError(
+            "faster-whisper is not installed.\n"
+            "    Install with: pip install faster-whisper"
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -93,7 +209,10 @@ def check_faster_whisper():
 
 
 def get_audio_duration(file_path: str) -> float:
-    """Get the duration of an audio file in seconds using ffprobe."""
+    """Get the duration of an audio file in seconds (WAV/FLAC header, else ffprobe)."""
+    duration = native_audio_duration(file_path)
+    if duration is not None:
+        return duration
     try:
         result = subprocess.run(
             [
@@ -115,12 +234,14 @@ def extract_audio_from_video(video_path: str) -> str:
     """Extract audio from a video file to a temporary WAV file."""
     temp_dir = tempfile.mkdtemp()
     temp_audio = os.path.join(temp_dir, "extracted_audio.wav")
+    track_temp_path(temp_dir)
 
     print(f"[*] Extracting audio from video: {Path(video_path).name}")
     try:
         subprocess.run(
             [
                 "ffmpeg",
+                *ffmpeg_thread_args(),
                 "-i", str(video_path),
                 "-vn",                  # no video
                 "-acodec", "pcm_s16le", # WAV format
@@ -135,8 +256,867 @@ def extract_audio_from_video(video_path: str) -> str:
         print("[+] Audio extraction complete.")
         return temp_audio
     except subprocess.CalledProcessError as e:
-        print(f"[!] Failed to extract audio: {e.stderr.decode() if e.stderr else e}")
-        sys.exit(1)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise AudioExtractionError(
+            f"Failed to extract audio: {e.stderr.decode() if e.stderr else e}"
+        ) from e
+
+
+def probe_audio_tracks(file_path: str) -> list:
+    """
+    List the audio streams of a container using ffprobe.
+    Returns: [{"index": n, "language": "eng" | None, "codec": ..., "channels": ...}]
+    where index is the audio-relative stream number (as in `-map 0:a:n`).
+    """
+    import json
+
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v", "error",
+                "-select_streams", "a",
+                "-show_entries", "stream=codec_name,channels:stream_tags=language",
+                "-of", "json",
+                str(file_path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        streams = json.loads(result.stdout or "{}").get("streams", [])
+    except (OSError, ValueError):
+        return []
+
+    tracks = []
+    for n, stream in enumerate(streams):
+        language = (stream.get("tags") or {}).get("language")
+        tracks.append({
+            "index": n,
+            "language": language if language and language != "und" else None,
+            "codec": stream.get("codec_name"),
+            "channels": stream.get("channels"),
+        })
+    return tracks
+
+
+def parse_audio_tracks(value: str):
+    """
+    argparse type for --audio-tracks: 'all' or a comma-separated list of
+    audio track indices and/or language tags (e.g. '0,2' or 'eng,jpn').
+    Returns None for 'all', else a list of ints and lowercase strings.
+    """
+    if value.strip().lower() == "all":
+        return None
+    selectors = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        selectors.append(int(item) if item.isdigit() else item)
+    if not selectors:
+        raise argparse.ArgumentTypeError("expected 'all' or a list of track indices / language tags")
+    return selectors
+
+
+def select_audio_tracks(tracks: list, selectors) -> list:
+    """Filter probed tracks by index or language tag (selectors None = all)."""
+    if selectors is None:
+        return list(tracks)
+    selected = []
+    for selector in selectors:
+        if isinstance(selector, int):
+            matches = [t for t in tracks if t["index"] == selector]
+        else:
+            matches = [t for t in tracks if (t["language"] or "").lower() == selector]
+        if not matches:
+            print(f"[!] No audio track matches '{selector}'")
+        selected.extend(t for t in matches if t not in selected)
+    return selected
+
+
+def audio_track_label(track: dict, tracks: list) -> str:
+    """Name used in output files: the language tag if unique, else a<index>."""
+    language = track["language"]
+    if language and sum(t["language"] == language for t in tracks) == 1:
+        return language
+    return f"a{track['index']}"
+
+
+def extract_audio_tracks(video_path: str, tracks: list):
+    """
+    Extract several audio tracks to 16 kHz mono WAVs with a single ffmpeg run,
+    so the container is demuxed once instead of once per track.
+    Returns: (temp_dir, [wav path per track])
+    """
+    temp_dir = tempfile.mkdtemp()
+    track_temp_path(temp_dir)
+
+    command = ["ffmpeg", *ffmpeg_thread_args(), "-i", str(video_path)]
+    outputs = []
+    for track in tracks:
+        out = os.path.join(temp_dir, f"track_{track['index']}.wav")
+        command += [
+            "-map", f"0:a:{track['index']}",
+            "-acodec", "pcm_s16le",
+            "-ar", "16000",
+            "-ac", "1",
+            "-y", out,
+        ]
+        outputs.append(out)
+
+    print(f"[*] Extracting {len(tracks)} audio track(s) from: {Path(video_path).name}")
+    try:
+        subprocess.run(command, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise AudioExtractionError(
+            f"Failed to extract audio: {e.stderr.decode() if e.stderr else e}"
+        ) from e
+    print("[+] Audio extraction complete.")
+    return temp_dir, outputs
+
+
+def load_audio_array(audio_path: str):
+    """Decode an audio/video file into a 16 kHz mono float32 NumPy array.
+    WAV (and FLAC with soundfile) is read in-process; the rest goes through PyAV."""
+    audio = read_native_audio(audio_path)
+    if audio is not None:
+        return audio
+
+    from faster_whisper.audio import decode_audio
+
+    return decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
+
+
+# ---------------------------------------------------------------------------
+# Resource Accounting
+# ---------------------------------------------------------------------------
+
+MB = 1024 * 1024
+
+# Samplers currently running; temp files created meanwhile are attributed to them
+_active_samplers = []
+
+
+def read_process_memory():
+    """
+    Current (rss_bytes, thread_count) of this process.
+    Uses psutil if installed, /proc on Linux, else rough fallbacks.
+    """
+    try:
+        import psutil
+
+        proc = psutil.Process()
+        return proc.memory_info().rss, proc.num_threads()
+    except ImportError:
+        pass
+
+    try:
+        rss, threads = 0, 0
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+        return rss, threads
+    except OSError:
+        pass
+
+    try:
+        import resource
+
+        # Lifetime peak, not current (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (peak if sys.platform == "darwin" else peak * 1024), threading.active_count()
+    except ImportError:
+        return 0, threading.active_count()
+
+
+def read_available_memory():
+    """Bytes of memory available to new allocations, or None if unknown."""
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _path_size(path) -> int:
+    """Size in bytes of a file or directory tree (0 if missing)."""
+    try:
+        if os.path.isdir(path):
+            return sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def track_temp_path(path):
+    """Attribute a temporary file/folder to the running resource samplers."""
+    for sampler in _active_samplers:
+        sampler.temp_paths.append(str(path))
+
+
+class ResourceSampler:
+    """
+    Samples resource usage of one job on a background thread.
+
+        with ResourceSampler("transcribe", model="small", file="a.mp3") as usage:
+            ...
+        usage.to_dict()
+
+    Records peak RSS, CPU user/sys time (including child processes such as
+    ffmpeg), peak thread count and peak size of temp files created by the job.
+    """
+
+    def __init__(self, job: str, interval: float = RESOURCE_SAMPLE_INTERVAL, **labels):
+        self.job = job
+        self.labels = labels
+        self.interval = interval
+        self.temp_paths = []
+
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self.peak_temp_bytes = 0
+        self.wall_seconds = 0.0
+        self.cpu_user = 0.0
+        self.cpu_sys = 0.0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss, threads = read_process_memory()
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_threads = max(self.peak_threads, threads)
+        if self.temp_paths:
+            temp_bytes = sum(_path_size(p) for p in self.temp_paths)
+            self.peak_temp_bytes = max(self.peak_temp_bytes, temp_bytes)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._start_wall = time.perf_counter()
+        self._start_times = os.times()
+        self._sample()
+        _active_samplers.append(self)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join(timeout=self.interval * 2)
+        self._sample()
+        _active_samplers.remove(self)
+
+        end_times = os.times()
+        self.wall_seconds = time.perf_counter() - self._start_wall
+        self.cpu_user = (end_times.user - self._start_times.user) + (
+            end_times.children_user - self._start_times.children_user
+        )
+        self.cpu_sys = (end_times.system - self._start_times.system) + (
+            end_times.children_system - self._start_times.children_system
+        )
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "job": self.job,
+            **self.labels,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "cpu_user_seconds": round(self.cpu_user, 3),
+            "cpu_sys_seconds": round(self.cpu_sys, 3),
+            "peak_rss_bytes": self.peak_rss,
+            "peak_threads": self.peak_threads,
+            "peak_temp_bytes": self.peak_temp_bytes,
+        }
+
+    def summary_line(self) -> str:
+        return (
+            f"[*] Resources ({self.job}): {self.wall_seconds:.1f}s wall, "
+            f"peak RSS {self.peak_rss / MB:.0f} MB, CPU {self.cpu_user:.1f}s user / "
+            f"{self.cpu_sys:.1f}s sys, {self.peak_threads} threads, "
+            f"temp {self.peak_temp_bytes / MB:.0f} MB"
+        )
+
+
+def format_resource_table(records: list) -> str:
+    """Render job resource records as a fixed-width table for the run summary."""
+    header = f"{'Job':<11} {'File':<28} {'Wall s':>7} {'RSS MB':>7} {'User s':>7} {'Sys s':>6} {'Thr':>4} {'Tmp MB':>7}"
+    rows = [header, "-" * len(header)]
+    for r in records:
+        name = Path(r.get("file", "")).name or "-"
+        if len(name) > 28:
+            name = name[:25] + "..."
+        rows.append(
+            f"{r['job']:<11} {name:<28} {r['wall_seconds']:>7.1f} "
+            f"{r['peak_rss_bytes'] / MB:>7.0f} {r['cpu_user_seconds']:>7.1f} "
+            f"{r['cpu_sys_seconds']:>6.1f} {r['peak_threads']:>4} "
+            f"{r['peak_temp_bytes'] / MB:>7.0f}"
+        )
+    return "\n".join(rows)
+
+
+def write_metrics_json(path, records: list):
+    import json
+
+    Path(path).write_text(json.dumps({"jobs": records}, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def write_metrics_prometheus(path, records: list):
+    """Write job records in the Prometheus text exposition format (gauges)."""
+    metrics = [
+        ("wall_seconds", "Wall-clock duration of the job."),
+        ("cpu_user_seconds", "User CPU time of the job, including child processes."),
+        ("cpu_sys_seconds", "System CPU time of the job, including child processes."),
+        ("peak_rss_bytes", "Peak resident memory of the process during the job."),
+        ("peak_threads", "Peak thread count of the process during the job."),
+        ("peak_temp_bytes", "Peak size of temporary files created by the job."),
+    ]
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    lines = []
+    for key, help_text in metrics:
+        name = f"faster_whisper_srt_job_{key}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for r in records:
+            labels = ",".join(
+                f'{k}="{escape(v)}"' for k, v in r.items() if k in ("job", "model", "models", "file")
+            )
+            lines.append(f"{name}{{{labels}}} {r[key]}")
+    Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def load_resource_history() -> dict:
+    import json
+
+    try:
+        return json.loads(RESOURCE_HISTORY_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def update_resource_history(records: list):
+    """Fold job records into the per-model peak memory history."""
+    import json
+
+    history = load_resource_history()
+    for r in records:
+        model_name = r.get("model")
+        if not model_name:
+            continue
+        entry = history.setdefault(model_name, {"peak_rss_mb": 0, "jobs": 0})
+        entry["peak_rss_mb"] = max(entry["peak_rss_mb"], round(r["peak_rss_bytes"] / MB))
+        entry["jobs"] += 1
+    try:
+        RESOURCE_HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        RESOURCE_HISTORY_PATH.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    except OSError as e:
+        print(f"[!] Could not save resource history: {e}")
+
+
+def admit_job(model_names, max_rss_mb: float, poll_seconds: float = 5.0) -> bool:
+    """
+    Memory guard for --max-rss, based on the recorded peak RSS of model_names
+    (one name, or a list of models that stay loaded together; their peaks are
+    summed, which counts the interpreter once per model and errs high).
+
+    Returns False (refuse) if the models are known to exceed the budget. If
+    they fit the budget but the machine currently lacks the free memory, waits
+    (queues) until enough is available. Models without history are admitted.
+    """
+    if isinstance(model_names, str):
+        model_names = [model_names]
+    history = load_resource_history()
+    known = [name for name in model_names if name in history]
+    if not known:
+        return True
+
+    predicted_mb = sum(history[name]["peak_rss_mb"] for name in known)
+    if predicted_mb > max_rss_mb:
+        label = "model" if len(known) == 1 else "models"
+        print(
+            f"[!] Refusing job: {label} '{'+'.join(known)}' previously peaked at {predicted_mb} MB "
+            f"(budget --max-rss {max_rss_mb:g} MB)."
+        )
+        return False
+
+    announced = False
+    while True:
+        available = read_available_memory()
+        current_mb = read_process_memory()[0] / MB
+        if available is None or available / MB >= predicted_mb - current_mb:
+            return True
+        if not announced:
+            print(f"[*] Waiting for ~{predicted_mb - current_mb:.0f} MB of free memory...")
+            announced = True
+        time.sleep(poll_seconds)
+
+
+# ---------------------------------------------------------------------------
+# CPU Placement
+# ---------------------------------------------------------------------------
+
+# Threads each model/ffmpeg may use; 0 leaves the library defaults (all cores)
+_cpu_threads = 0
+
+
+def available_cpus() -> list:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(value: str) -> list:
+    """argparse type for --cpus: a CPU list such as '0-7,16,18'."""
+    cpus = set()
+    try:
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            first, _, last = part.partition("-")
+            cpus.update(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a CPU list like '0-7,16', got {value!r}")
+    if not cpus:
+        raise argparse.ArgumentTypeError("CPU list is empty")
+    return sorted(cpus)
+
+
+def parse_cpu_slot(value: str):
+    """argparse type for --cpu-slot: 'K/N' = slot K (0-based) of N equal slots."""
+    try:
+        slot, _, count = value.partition("/")
+        slot, count = int(slot), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N such as 0/4, got {value!r}")
+    if count < 1 or not 0 <= slot < count:
+        raise argparse.ArgumentTypeError(f"slot must satisfy 0 <= K < N, got {value!r}")
+    return slot, count
+
+
+def cpu_slot(slot: int, count: int, cpus: list = None) -> list:
+    """
+    Split the CPUs into `count` contiguous, near-equal groups and return group
+    `slot`. Contiguous ranges keep a job on neighbouring cores, which on most
+    hosts means the same NUMA node and shared caches.
+    """
+    cpus = sorted(cpus if cpus is not None else available_cpus())
+    if count > len(cpus):
+        raise TranscriptionError(f"Cannot split {len(cpus)} CPUs into {count} slots.")
+    size, extra = divmod(len(cpus), count)
+    start = slot * size + min(slot, extra)
+    return cpus[start:start + size + (1 if slot < extra else 0)]
+
+
+def apply_cpu_placement(cpus: list):
+    """
+    Pin this process (and the ffmpeg processes it starts, which inherit the
+    affinity) to `cpus`, and cap model, OpenMP and ffmpeg threads to match so
+    side-by-side jobs do not oversubscribe the host. Must run before the
+    model is loaded.
+    """
+    global _cpu_threads
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    else:
+        print("[!] CPU pinning is not supported on this platform; only limiting thread counts.")
+    _cpu_threads = len(cpus)
+    os.environ["OMP_NUM_THREADS"] = str(_cpu_threads)
+    print(f"[*] CPU placement: {_cpu_threads} thread(s) on CPUs {format_cpu_list(cpus)}")
+
+
+def format_cpu_list(cpus: list) -> str:
+    """Compact form of a CPU list: [0, 1, 2, 3, 8] -> '0-3,8'."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(f"{a}-{b}" if a != b else f"{a}" for a, b in ranges)
+
+
+def ffmpeg_thread_args() -> list:
+    """ffmpeg options that respect the CPU placement (empty if none applied)."""
+    return ["-threads", str(_cpu_threads)] if _cpu_threads else []
+
+
+# ---------------------------------------------------------------------------
+# Windowed PCM Reader
+# ---------------------------------------------------------------------------
+
+
+def read_wav_header(file_path) -> dict:
+    """
+    Parse a RIFF/WAVE header without reading the sample data.
+    Returns: dict(format_tag, channels, sample_rate, bits_per_sample,
+                  data_offset, data_size)
+    Raises ValueError if the file is not a WAV file or its header is malformed.
+    """
+    import struct
+
+    with open(file_path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {file_path}")
+
+        header = {}
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    raise ValueError(f"Truncated WAV fmt chunk: {file_path}")
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if channels == 0 or sample_rate == 0 or bits == 0:
+                    raise ValueError(
+                        f"Invalid WAV format ({channels} channels, {sample_rate} Hz, "
+                        f"{bits} bits): {file_path}"
+                    )
+                if format_tag == 0xFFFE and len(fmt) >= 26:
+                    # WAVE_FORMAT_EXTENSIBLE: real format code leads the SubFormat GUID
+                    format_tag = struct.unpack("<H", fmt[24:26])[0]
+                header.update(
+                    format_tag=format_tag,
+                    channels=channels,
+                    sample_rate=sample_rate,
+                    bits_per_sample=bits,
+                )
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                # Streamed WAVs (e.g. ffmpeg writing to a pipe) leave the size unset
+                available = os.path.getsize(file_path) - data_offset
+                header.update(data_offset=data_offset, data_size=min(chunk_size, available))
+                break
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    if "format_tag" not in header or "data_offset" not in header:
+        raise ValueError(f"Incomplete WAV header: {file_path}")
+    return header
+
+
+def is_whisper_ready_wav(file_path) -> bool:
+    """True if the file is 16-bit PCM, 16 kHz, mono WAV (what Whisper consumes natively)."""
+    try:
+        header = read_wav_header(file_path)
+    except (OSError, ValueError):
+        return False
+    return (
+        header["format_tag"] == 1
+        and header["channels"] == 1
+        and header["sample_rate"] == SAMPLE_RATE
+        and header["bits_per_sample"] == 16
+    )
+
+
+class PCMAudioSource:
+    """
+    Reads a 16 kHz mono 16-bit PCM WAV from disk one window at a time.
+
+    Each window is read with an explicit offset/count and dropped once it has
+    been decoded, so resident memory is bounded by the window length rather
+    than the recording length (a whole-file memory map would keep every page
+    it touched resident).
+    """
+
+    def __init__(self, file_path):
+        if not is_whisper_ready_wav(file_path):
+            raise ValueError(f"Expected 16 kHz mono 16-bit PCM WAV: {file_path}")
+
+        header = read_wav_header(file_path)
+        self.file_path = str(file_path)
+        self.data_offset = header["data_offset"]
+        self.num_samples = header["data_size"] // 2
+
+    @property
+    def duration(self) -> float:
+        return self.num_samples / SAMPLE_RATE
+
+    def read(self, start: int, end: int):
+        """Samples [start, end) as int16, read straight from the file."""
+        import numpy as np
+
+        return np.fromfile(
+            self.file_path, dtype="<i2", count=max(0, end - start), offset=self.data_offset + start * 2
+        )
+
+    def _find_cut(self, start: int, end: int) -> int:
+        """Return the sample index of the quietest 100 ms frame in samples[start:end]."""
+        import numpy as np
+
+        frame = SAMPLE_RATE // 10
+        n_frames = (end - start) // frame
+        if n_frames < 2:
+            return end
+
+        region = self.read(start, start + n_frames * frame).astype(np.float32)
+        energy = np.square(region).reshape(n_frames, frame).mean(axis=1)
+        return start + int(np.argmin(energy)) * frame + frame // 2
+
+    def iter_windows(
+        self,
+        window_seconds: float = PCM_WINDOW_SECONDS,
+        search_seconds: float = PCM_CUT_SEARCH_SECONDS,
+    ):
+        """Yield (offset_seconds, float32 window) pairs covering the whole file."""
+        import numpy as np
+
+        total = self.num_samples
+        window = int(window_seconds * SAMPLE_RATE)
+        search = int(search_seconds * SAMPLE_RATE)
+
+        pos = 0
+        while pos < total:
+            end = min(pos + window, total)
+            if end < total:
+                end = self._find_cut(max(end - search, pos + 1), end)
+
+            chunk = self.read(pos, end).astype(np.float32)
+            chunk /= 32768.0
+            yield pos / SAMPLE_RATE, chunk
+            del chunk  # do not hold the previous window while reading the next
+            pos = end
+
+
+# ---------------------------------------------------------------------------
+# Native Audio Fast Paths
+# ---------------------------------------------------------------------------
+# WAV and FLAC inputs are sniffed by header and loaded in-process, avoiding an
+# ffprobe/ffmpeg (or PyAV) start-up per file. Anything else, including
+# compressed WAV payloads, falls back to the external decoders.
+
+# WAV format tags and sample widths we can convert with NumPy alone
+WAV_FORMAT_PCM = 1
+WAV_FORMAT_FLOAT = 3
+NATIVE_PCM_BITS = {WAV_FORMAT_PCM: (8, 16, 24, 32), WAV_FORMAT_FLOAT: (32, 64)}
+
+
+def read_flac_streaminfo(file_path) -> dict:
+    """
+    Parse the STREAMINFO block of a FLAC file.
+    Returns: dict(sample_rate, channels, bits_per_sample, total_samples)
+    Raises ValueError if the file is not FLAC.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(42)
+    # "fLaC", then a 4-byte block header; STREAMINFO is always the first block
+    if len(head) < 42 or head[:4] != b"fLaC" or head[4] & 0x7F != 0:
+        raise ValueError(f"Not a FLAC file: {file_path}")
+    info = int.from_bytes(head[18:26], "big")
+    return {
+        "sample_rate": info >> 44,
+        "channels": ((info >> 41) & 0x7) + 1,
+        "bits_per_sample": ((info >> 36) & 0x1F) + 1,
+        "total_samples": info & 0xFFFFFFFFF,
+    }
+
+
+def native_audio_duration(file_path):
+    """Duration in seconds read from a WAV/FLAC header, or None if unknown."""
+    try:
+        header = read_wav_header(file_path)
+        if header["bits_per_sample"] not in NATIVE_PCM_BITS.get(header["format_tag"], ()):
+            return None  # compressed payload: frame size is not derivable here
+        block_align = header["channels"] * header["bits_per_sample"] // 8
+        if header["sample_rate"]:
+            return header["data_size"] // block_align / header["sample_rate"]
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        info = read_flac_streaminfo(file_path)
+        if info["total_samples"] and info["sample_rate"]:
+            return info["total_samples"] / info["sample_rate"]
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _read_wav_samples(file_path, header):
+    """Read PCM/float WAV data as a (frames, channels) float32 array in [-1, 1]."""
+    import numpy as np
+
+    bits, channels = header["bits_per_sample"], header["channels"]
+    width = bits // 8
+    frames = header["data_size"] // (width * channels)
+    count = frames * channels
+    offset = header["data_offset"]
+
+    if header["format_tag"] == WAV_FORMAT_FLOAT:
+        data = np.fromfile(file_path, dtype=f"<f{width}", count=count, offset=offset)
+        data = data.astype(np.float32, copy=False)
+    elif bits == 8:
+        data = np.fromfile(file_path, dtype=np.uint8, count=count, offset=offset)
+        data = (data.astype(np.float32) - 128.0) / 128.0
+    elif bits == 24:
+        raw = np.fromfile(file_path, dtype=np.uint8, count=count * 3, offset=offset).reshape(-1, 3)
+        data = (
+            raw[:, 0].astype(np.int32)
+            | (raw[:, 1].astype(np.int32) << 8)
+            | (raw[:, 2].astype(np.int32) << 16)
+        )
+        data = ((data << 8) >> 8).astype(np.float32) / float(1 << 23)  # sign-extend
+    else:
+        data = np.fromfile(file_path, dtype=f"<i{width}", count=count, offset=offset)
+        data = data.astype(np.float32) / float(1 << (bits - 1))
+    return data.reshape(-1, channels)
+
+
+def resample_to_whisper(samples, sample_rate: int):
+    """
+    Vectorized conversion of float32 mono audio to SAMPLE_RATE.
+
+    Downsampling first applies a Hann-windowed sinc low-pass just below the
+    new Nyquist frequency; integer ratios (32 / 48 / 96 kHz) then take every
+    n-th sample, other ratios interpolate linearly. Upsampling interpolates
+    linearly (speech above 4 kHz is not recovered either way).
+    """
+    import numpy as np
+
+    if sample_rate == SAMPLE_RATE or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+
+    ratio = sample_rate / SAMPLE_RATE
+    if ratio > 1:
+        half = int(np.ceil(8 * ratio))
+        t = np.arange(-half, half + 1)
+        cutoff = 0.45 / ratio  # cycles per input sample
+        taps = 2 * cutoff * np.sinc(2 * cutoff * t) * np.hanning(2 * half + 1)
+        samples = np.convolve(samples, (taps / taps.sum()).astype(np.float32), mode="same")
+        if ratio.is_integer():
+            return np.ascontiguousarray(samples[::int(ratio)], dtype=np.float32)
+
+    n_out = int(len(samples) / ratio)
+    positions = np.arange(n_out, dtype=np.float64) * ratio
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def read_native_audio(file_path):
+    """
+    Load a WAV (8/16/24/32-bit PCM or 32/64-bit float, any rate and channel
+    count) or, when the optional `soundfile` package is installed, a FLAC file
+    as 16 kHz mono float32 without external decoders.
+    Returns None if the file needs ffmpeg.
+    """
+    try:
+        header = read_wav_header(file_path)
+    except (OSError, ValueError):
+        header = None
+
+    if header is not None:
+        if header["bits_per_sample"] not in NATIVE_PCM_BITS.get(header["format_tag"], ()):
+            return None
+        samples, sample_rate = _read_wav_samples(file_path, header), header["sample_rate"]
+    else:
+        try:
+            read_flac_streaminfo(file_path)
+            import soundfile
+        except (OSError, ValueError, ImportError):
+            return None
+        try:
+            samples, sample_rate = soundfile.read(str(file_path), dtype="float32", always_2d=True)
+        except RuntimeError:
+            return None
+
+    mono = samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1)
+    return resample_to_whisper(mono, sample_rate)
+
+
+# ---------------------------------------------------------------------------
+# Silence Trimming
+# ---------------------------------------------------------------------------
+
+
+class SpeechOffsetMap:
+    """
+    Maps timestamps in a silence-trimmed (speech-only) buffer back to the
+    original media timeline.
+
+    chunks: list of {"start": sample, "end": sample} speech regions, as
+            returned by faster_whisper.vad.get_speech_timestamps.
+    """
+
+    def __init__(self, chunks, sampling_rate: int = SAMPLE_RATE):
+        self.compact_starts = []
+        self.compact_ends = []
+        self.original_starts = []
+
+        offset = 0.0
+        for chunk in chunks:
+            duration = (chunk["end"] - chunk["start"]) / sampling_rate
+            self.compact_starts.append(offset)
+            self.compact_ends.append(offset + duration)
+            self.original_starts.append(chunk["start"] / sampling_rate)
+            offset += duration
+
+        self.speech_duration = offset
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Convert a compact-buffer time to original media time.
+
+        is_end: resolve times that fall exactly on a region boundary to the
+                end of the earlier region instead of the start of the next.
+        """
+        if not self.compact_starts:
+            return seconds
+
+        if is_end:
+            idx = bisect.bisect_left(self.compact_ends, seconds)
+        else:
+            idx = bisect.bisect_right(self.compact_starts, seconds) - 1
+        idx = min(max(idx, 0), len(self.compact_starts) - 1)
+
+        region_length = self.compact_ends[idx] - self.compact_starts[idx]
+        within = min(max(seconds - self.compact_starts[idx], 0.0), region_length)
+        return self.original_starts[idx] + within
+
+
+def build_speech_only_audio(audio, vad_parameters=None):
+    """
+    Run VAD over a 16 kHz float32 buffer and concatenate only the speech regions.
+    Returns: (compact_audio, SpeechOffsetMap)
+    """
+    import numpy as np
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    chunks = get_speech_timestamps(audio, VadOptions(**(vad_parameters or {})))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32), SpeechOffsetMap([])
+
+    compact = np.concatenate([audio[c["start"]:c["end"]] for c in chunks])
+    return compact, SpeechOffsetMap(chunks)
 
 
 # ---------------------------------------------------------------------------
@@ -144,14 +1124,17 @@ def extract_audio_from_video(video_path: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def format_timestamp(seconds: float) -> str:
-    """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)."""
+def format_timestamp(seconds: float, decimal_marker: str = ",") -> str:
+    """Convert seconds to SRT timestamp format (HH:MM:SS,mmm).
+
+    decimal_marker: use "." for WebVTT (HH:MM:SS.mmm).
+    """
     td = timedelta(seconds=seconds)
     hours = int(td.total_seconds() // 3600)
     minutes = int((td.total_seconds() % 3600) // 60)
     secs = int(td.total_seconds() % 60)
     millis = int((td.total_seconds() % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{millis:03d}"
 
 
 def split_text_by_chars(text: str, max_chars: int, min_chars: int = 4) -> list:
@@ -178,17 +1161,47 @@ def split_text_by_chars(text: str, max_chars: int, min_chars: int = 4) -> list:
     return lines
 
 
+def build_cues(text: str, start: float, end: float, max_chars: int) -> list:
+    """
+    Split one transcribed segment into subtitle cues of at most max_chars,
+    sharing the segment duration evenly.
+    Returns: list of (start_seconds, end_seconds, line)
+    """
+    lines = split_text_by_chars(text, max_chars)
+    duration = end - start
+    time_per_line = duration / len(lines) if lines else duration
+
+    return [
+        (start + (i * time_per_line), start + ((i + 1) * time_per_line), line)
+        for i, line in enumerate(lines)
+    ]
+
+
+def format_srt(cues) -> str:
+    """Render (start_seconds, end_seconds, line) cues as numbered SRT blocks."""
+    srt_lines = []
+    for subtitle_index, (start_time, end_time, line) in enumerate(cues, 1):
+        srt_lines.append(f"{subtitle_index}")
+        srt_lines.append(
+            f"{format_timestamp(start_time)} --> {format_timestamp(end_time)}"
+        )
+        srt_lines.append(line)
+        srt_lines.append("")
+    return "\n".join(srt_lines)
+
+
 # ---------------------------------------------------------------------------
 # Model Loading with Progress Indicator
 # ---------------------------------------------------------------------------
 
 
-def load_model_with_progress(model_name: str, on_progress_callback=None):
+def load_model_with_progress(model_name: str, on_progress_callback=None, num_workers: int = 1):
     """
     Load a faster-whisper model with a visual progress indicator.
     
     on_progress_callback: function(str) -> None. If provided, status messages
                           are sent here instead of stdout.
+    num_workers: number of threads that may call transcribe() concurrently.
     """
     from faster_whisper import WhisperModel
 
@@ -252,7 +1265,13 @@ def load_model_with_progress(model_name: str, on_progress_callback=None):
     t.start()
 
     try:
-        model = WhisperModel(model_name, device="cpu", compute_type="int8")
+        model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=_cpu_threads,
+            num_workers=num_workers,
+        )
     except Exception as e:
         stop_flag = True
         raise e
@@ -299,43 +1318,600 @@ def get_model_path_info(model_name: str):
 
 
 # ---------------------------------------------------------------------------
-# Core Transcription
+# Transcription Engines
 # ---------------------------------------------------------------------------
+#
+# The pipeline only needs an object with
+#
+#     transcribe(audio, **options) -> (iterable of segments, info)
+#
+# where `audio` is a file path or a 16 kHz float32 NumPy array and each
+# segment has start, end, text, avg_logprob, compression_ratio and
+# no_speech_prob. Engines may also provide batched() for --batch-size.
 
+ENGINES = ["faster-whisper", "synthetic"]
 
-def transcribe_and_build_srt(
-    audio_path: str,
-    model,
-    model_name: str,
-    max_chars: int = 40,
-    progress_callback=None,
-) -> str:
-    """Transcribe audio using a pre-loaded faster-whisper model and return SRT content.
 
-    progress_callback: function(current_seconds, total_seconds)
-    """
-    from tqdm import tqdm
+class TranscriptionEngine(Protocol):
+    """What the pipeline needs from a model (a raw WhisperModel also fits)."""
 
-    # --- Get duration for progress bar ---
-    total_duration = get_audio_duration(audio_path)
-    if total_duration <= 0:
-        print("[!] Could not determine audio duration. Progress bar will be approximate.")
-        total_duration = 1.0
+    def transcribe(self, audio, **options): ...
 
-    if progress_callback:
-        progress_callback(0, total_duration)
 
-    # --- Transcribe with progress ---
-    print(f"[*] Transcribing: {Path(audio_path).name}")
-    segments_iter, info = model.transcribe(
-        audio_path,
-        language="zh",
-        word_timestamps=False,
-        vad_filter=True,
-    )
+class FasterWhisperEngine:
+    """The production engine: a faster-whisper WhisperModel (or batched pipeline)."""
 
-    srt_lines = []
-    subtitle_index = 1
+    name = "faster-whisper"
+
+    def __init__(self, whisper_model):
+        self.whisper_model = whisper_model
+
+    def transcribe(self, audio, **options):
+        return self.whisper_model.transcribe(audio, **options)
+
+    def batched(self) -> TranscriptionEngine:
+        return FasterWhisperEngine(get_batched_pipeline(self.whisper_model))
+
+
+SyntheticSegment = namedtuple(
+    "SyntheticSegment",
+    "id start end text avg_logprob compression_ratio no_speech_prob temperature",
+)
+
+SYNTHETIC_TEXT = "合成引擎產生的固定字幕內容用於測量轉檔流程本身的效能與負擔"
+
+
+class SyntheticEngine:
+    """
+    Deterministic stand-in for a speech model, for offline pipeline benchmarks.
+
+    Emits one segment every segment_seconds of audio with `chars` characters
+    of fixed text. rtf is the simulated real-time factor: each segment takes
+    segment_seconds * rtf of wall time (0 = as fast as possible). Options that
+    only matter to a real decoder are accepted and ignored.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, rtf: float = 0.0, segment_seconds: float = 4.0, chars: int = 20):
+        if rtf < 0:
+            raise TranscriptionError(f"Synthetic engine rtf must be >= 0, got {rtf:g}")
+        if segment_seconds <= 0:
+            raise TranscriptionError(f"Synthetic engine segment_seconds must be > 0, got {segment_seconds:g}")
+        if chars < 1:
+            raise TranscriptionError(f"Synthetic engine chars must be >= 1, got {chars:g}")
+        self.rtf = float(rtf)
+        self.segment_seconds = float(segment_seconds)
+        self.chars = int(chars)
+
+    def _duration(self, audio) -> float:
+        if isinstance(audio, (str, Path)):
+            return get_audio_duration(str(audio))
+        return len(audio) / SAMPLE_RATE
+
+    def transcribe(self, audio, **options):
+        duration = self._duration(audio)
+        info = SimpleNamespace(language="zh", language_probability=1.0, duration=duration)
+
+        def generate():
+            count = int(duration // self.segment_seconds)
+            for i in range(count):
+                if self.rtf > 0:
+                    time.sleep(self.segment_seconds * self.rtf)
+                start = i * self.segment_seconds
+                offset = (i * 7) % len(SYNTHETIC_TEXT)
+                text = (SYNTHETIC_TEXT[offset:] + SYNTHETIC_TEXT)[:self.chars]
+                yield SyntheticSegment(
+                    id=i + 1,
+                    start=start,
+                    end=min(start + self.segment_seconds * 0.9, duration),
+                    text=text,
+                    avg_logprob=-0.3,
+                    compression_ratio=1.3,
+                    no_speech_prob=0.05,
+                    temperature=0.0,
+                )
+
+        return generate(), info
+
+    def batched(self):
+        return self
+
+
+def parse_engine_spec(spec: str):
+    """
+    Parse an --engine value such as "synthetic:rtf=0.05,segment_seconds=4,chars=20".
+    Returns: (engine_name, options_dict)
+    """
+    name, _, option_text = spec.partition(":")
+    if name not in ENGINES:
+        raise argparse.ArgumentTypeError(f"unknown engine {name!r} (choose from {', '.join(ENGINES)})")
+
+    options = {}
+    for item in filter(None, option_text.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"engine option {item!r} must look like key=value")
+        try:
+            options[key.strip()] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"engine option {key!r} must be a number")
+    return name, options
+
+
+def load_engine(
+    model_name: str,
+    engine: str = "faster-whisper",
+    on_progress_callback=None,
+    num_workers: int = 1,
+) -> TranscriptionEngine:
+    """
+    Create the transcription engine for a run.
+
+    engine: an --engine spec (see parse_engine_spec). The synthetic engine
+            ignores model_name and never touches faster-whisper.
+    num_workers: threads that may decode with the engine at the same time.
+    """
+    name, options = parse_engine_spec(engine)
+
+    if name == "synthetic":
+        try:
+            synthetic = SyntheticEngine(**options)
+        except TypeError as e:
+            raise TranscriptionError(f"Invalid synthetic engine options: {e}") from e
+        msg = (
+            f"[*] Using synthetic engine (rtf {synthetic.rtf:g}, "
+            f"{synthetic.segment_seconds:g}s segments, {synthetic.chars} chars)"
+        )
+        if on_progress_callback:
+            on_progress_callback(msg)
+        else:
+            print(msg)
+        return synthetic
+
+    check_faster_whisper()
+    return FasterWhisperEngine(
+        load_model_with_progress(model_name, on_progress_callback, num_workers=num_workers)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Batched Decoding
+# ---------------------------------------------------------------------------
+
+
+def parse_batch_size(value: str):
+    """argparse type for --batch-size: a positive integer or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer or 'auto', got {value!r}")
+    if size < 1:
+        raise argparse.ArgumentTypeError("batch size must be at least 1")
+    return size
+
+
+def resolve_batch_size(batch_size, model_name: str) -> int:
+    """Turn a --batch-size value into a concrete batch size ("auto" uses free memory)."""
+    if batch_size != "auto":
+        return int(batch_size)
+
+    available = read_available_memory()
+    if available is None:
+        return 8
+    item_mb = BATCH_ITEM_MB.get(model_name, 150)
+    return max(1, min(MAX_AUTO_BATCH_SIZE, int(available / MB * 0.5 / item_mb)))
+
+
+def get_batched_pipeline(model):
+    """Return the batched-decoding form of an engine, or wrap a raw WhisperModel
+    in faster-whisper's batched inference pipeline."""
+    if hasattr(model, "batched"):
+        return model.batched()
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        raise MissingDependencyError(
+            "Batched decoding requires faster-whisper >= 1.1.0.\n"
+            "    Upgrade with: pip install -U faster-whisper"
+        )
+    return BatchedInferencePipeline(model=model)
+
+
+# ---------------------------------------------------------------------------
+# Decode-Loop Guard
+# ---------------------------------------------------------------------------
+
+
+def find_repeated_ngram(text: str):
+    """
+    Return the n-gram repeated back-to-back too often in text, or None.
+    Space-separated languages are checked per word, others per character.
+    """
+    words = text.split()
+    tokens = words if len(words) >= GUARD_NGRAM_REPEATS * 2 else list(text.replace(" ", ""))
+
+    for n in range(1, GUARD_NGRAM_MAX + 1):
+        needed = GUARD_CHAR_REPEATS if n == 1 and tokens is not words else GUARD_NGRAM_REPEATS
+        for i in range(0, len(tokens) - n * needed + 1):
+            gram = tokens[i:i + n]
+            repeats = 1
+            while tokens[i + repeats * n:i + (repeats + 1) * n] == gram:
+                repeats += 1
+            if repeats >= needed:
+                return ("" if tokens is not words else " ").join(gram)
+    return None
+
+
+class DecodeGuard:
+    """
+    Watches segments as they stream out of the decoder and decides whether
+    to keep them, re-decode the rest of the audio with cheaper settings, or
+    stop because the per-file wall-clock budget is spent.
+
+    Every intervention is printed and kept in `interventions` with the media
+    timestamp and the wall-clock time it happened.
+    """
+
+    KEEP, REDECODE_FROM_START, REDECODE_FROM_END, STOP = range(4)
+
+    def __init__(self, time_budget: float = None):
+        self.time_budget = time_budget
+        self.started = time.monotonic()
+        self.last_wall = self.started
+        self.last_end = 0.0
+        self.audio_done = 0.0
+        self.interventions = []
+        self.recent_texts = []
+        self.stopped = False
+        self.window_offset = 0.0
+        self.offset_map = None
+        # The burst of segments currently arriving: the wall time spent before
+        # its first segment, the audio it has covered so far, the running RTF
+        # and audio done before it, and where it ends on the media timeline
+        self.burst_wall = 0.0
+        self.burst_audio = 0.0
+        self.burst_rtf = 0.0
+        self.burst_after = 0.0
+        self.burst_end = 0.0
+
+    def set_timeline(self, window_offset: float = 0.0, offset_map=None):
+        """
+        Describe how the audio being decoded maps onto the media: it starts at
+        window_offset seconds and, when silence was trimmed, offset_map turns
+        compact-buffer times back into window times. Used for logging only.
+        """
+        self.window_offset = window_offset
+        self.offset_map = offset_map
+        self.last_end = 0.0
+
+    def media_time(self, seconds: float) -> float:
+        if self.offset_map:
+            seconds = self.offset_map.to_original(seconds)
+        return self.window_offset + seconds
+
+    @property
+    def running_rtf(self) -> float:
+        elapsed = self.last_wall - self.started
+        return elapsed / self.audio_done if self.audio_done else 0.0
+
+    def log(self, audio_time: float, kind: str, detail: str):
+        """Record an intervention at audio_time (seconds into the decoded audio)."""
+        self._record(self.media_time(audio_time), kind, detail)
+
+    def _record(self, media_time: float, kind: str, detail: str):
+        entry = {
+            "media_time": round(media_time, 3),
+            "wall_time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "kind": kind,
+            "detail": detail,
+        }
+        self.interventions.append(entry)
+        print(f"\n[!] Guard {format_timestamp(media_time)} {kind}: {detail}")
+
+    def _burst_was_slow(self) -> bool:
+        return (
+            self.burst_after >= GUARD_WARMUP_SECONDS
+            and self.burst_wall >= GUARD_MIN_SLOW_SECONDS
+            and self.burst_wall > GUARD_SLOW_FACTOR * self.burst_rtf * max(self.burst_audio, 1.0)
+        )
+
+    def check(self, segment, start: float, end: float, cheap: bool) -> int:
+        """Classify one decoded segment (start/end on the window timeline)."""
+        now = time.monotonic()
+        wall = now - self.last_wall
+        advance = max(end - self.last_end, 0.0)
+
+        if self.time_budget and now - self.started > self.time_budget:
+            self.stopped = True
+            self.log(start, "budget", f"{self.time_budget:g}s per-file budget spent; keeping output so far")
+            return self.STOP
+
+        # A pause before this segment means the previous burst is complete and
+        # its cost can be judged against all the audio it covered
+        slow = None
+        if wall > GUARD_BURST_SECONDS:
+            if not cheap and self._burst_was_slow():
+                slow = (
+                    self.burst_end,
+                    f"window took {self.burst_wall:.1f}s for {self.burst_audio:.1f}s of audio "
+                    f"(running {self.burst_rtf:.2f}s/s); cheaper settings for the rest",
+                )
+            self.burst_wall = wall
+            self.burst_audio = 0.0
+            self.burst_rtf = self.running_rtf
+            self.burst_after = self.audio_done
+
+        text = segment.text.strip()
+        gram = find_repeated_ngram(text) if text else None
+        looping = text and self.recent_texts[-2:] == [text, text]
+        if gram or looping or segment.compression_ratio > GUARD_MAX_COMPRESSION:
+            if gram:
+                detail = f"repeated {gram!r}"
+            elif looping:
+                detail = f"same text three times {text[:20]!r}"
+            else:
+                detail = f"compression ratio {segment.compression_ratio:.2f}"
+            action = self.REDECODE_FROM_END if cheap else self.REDECODE_FROM_START
+            self.log(start, "repetition", detail + (
+                "; skipping segment" if cheap else "; re-decoding with cheaper settings"
+            ))
+            self.last_wall = now
+            return action
+
+        self.recent_texts = (self.recent_texts + [text])[-2:]
+        self.last_wall = now
+        self.last_end = end
+        self.audio_done += advance
+        self.burst_audio += advance
+        self.burst_end = self.media_time(end)
+
+        if slow:
+            # The slow burst is already output; this segment (first of the
+            # next burst) is kept too and the rest is re-decoded cheaply
+            self._record(slow[0], "slow", slow[1])
+            return self.REDECODE_FROM_END
+        return self.KEEP
+
+    def summary_line(self) -> str:
+        kinds = {}
+        for entry in self.interventions:
+            kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+        detail = ", ".join(f"{k} {v}" for k, v in sorted(kinds.items()))
+        return f"[*] Guard: {len(self.interventions)} interventions" + (f" ({detail})" if detail else "")
+
+
+def cheap_decode_options(batched: bool) -> dict:
+    """Decoding settings that bound per-window cost: greedy, no temperature fallback."""
+    options = {"beam_size": 1, "best_of": 1, "temperature": 0.0}
+    if not batched:
+        # Conditioning on previous text is what feeds most repetition loops
+        options["condition_on_previous_text"] = False
+    return options
+
+
+def iter_guarded_segments(
+    transcriber,
+    audio,
+    guard: DecodeGuard,
+    batched: bool = False,
+    window_offset: float = 0.0,
+    offset_map=None,
+    **options,
+):
+    """
+    Run transcriber.transcribe(audio, **options) under a DecodeGuard.
+    Yields (segment, start, end) with times relative to `audio`.
+    window_offset / offset_map place `audio` on the media timeline so
+    interventions are logged with media timestamps.
+
+    When the guard intervenes, the generator is abandoned and decoding
+    restarts from the intervention point with cheap_decode_options().
+    """
+    import numpy as np
+
+    guard.set_timeline(window_offset, offset_map)
+    offset = 0.0
+    current = audio
+    cheap = False
+
+    while True:
+        run_options = dict(options, **cheap_decode_options(batched)) if cheap else options
+        segments_iter, _ = transcriber.transcribe(current, **run_options)
+
+        restart_at = None
+        for segment in segments_iter:
+            start, end = offset + segment.start, offset + segment.end
+            action = guard.check(segment, start, end, cheap)
+            if action == DecodeGuard.STOP:
+                return
+            if action == DecodeGuard.KEEP:
+                yield segment, start, end
+                continue
+            if action == DecodeGuard.REDECODE_FROM_END:
+                # Slow windows are already paid for, so keep their output
+                if not cheap and segment.text.strip() and segment.compression_ratio <= GUARD_MAX_COMPRESSION:
+                    yield segment, start, end
+                restart_at = end
+            else:
+                restart_at = start
+            break
+        else:
+            return
+
+        # Re-decoding needs the waveform so the remainder can be sliced off
+        if not isinstance(audio, np.ndarray):
+            audio = load_audio_array(audio)
+        restart_at = max(restart_at, offset + 0.01) if cheap else restart_at
+        offset = restart_at
+        current = audio[int(offset * SAMPLE_RATE):]
+        cheap = True
+        if len(current) < SAMPLE_RATE // 10:
+            return
+
+
+# ---------------------------------------------------------------------------
+# Core Transcription
+# ---------------------------------------------------------------------------
+
+
+def transcribe_and_build_srt(
+    audio_path: str,
+    model: TranscriptionEngine,
+    model_name: str,
+    max_chars: int = 40,
+    progress_callback=None,
+    trim_silence: bool = False,
+    windowed_audio: bool = False,
+    batch_size=None,
+    guard: bool = False,
+    time_budget: float = None,
+    speech_audio=None,
+) -> str:
+    """Transcribe audio using a pre-loaded faster-whisper model and return SRT content.
+
+    progress_callback: function(current_seconds, total_seconds)
+    trim_silence: run VAD up front and transcribe only the concatenated speech
+                  regions. Progress is then reported in speech seconds and cue
+                  times are mapped back to the original media timeline.
+    windowed_audio: audio_path must be a 16 kHz mono PCM WAV. It is read from
+                  disk and decoded window by window, so peak memory does not
+                  grow with input length. Combined with trim_silence, VAD runs
+                  per window and progress stays in media seconds.
+    batch_size:   decode VAD speech chunks in parallel batches of this size
+                  (int or "auto") through faster-whisper's batched pipeline.
+                  None keeps the default sequential decoding.
+    guard:        watch the decode loop for repetition/hallucination and
+                  runaway windows and re-decode with cheaper settings.
+    time_budget:  per-file wall-clock budget in seconds (implies guard); when
+                  spent, the SRT is built from the segments decoded so far.
+    speech_audio: (audio, SpeechOffsetMap) from build_speech_only_audio(),
+                  already computed for audio_path. Implies trim_silence and
+                  skips decoding and VAD, so one result can serve several models.
+    """
+    from tqdm import tqdm
+
+    if speech_audio is not None:
+        trim_silence = True
+
+    decode_guard = DecodeGuard(time_budget) if (guard or time_budget) else None
+
+    transcriber = model
+    if batch_size:
+        batch_size = resolve_batch_size(batch_size, model_name)
+        transcriber = get_batched_pipeline(model)
+        print(f"[*] Batched decoding: batch size {batch_size}")
+
+    offset_map = None
+    speech_progress = trim_silence and not windowed_audio
+
+    if windowed_audio:
+        source = PCMAudioSource(audio_path)
+        total_duration = source.duration
+        windows = source.iter_windows()
+        print(
+            f"[*] Reading {total_duration:.1f}s of audio from disk "
+            f"({PCM_WINDOW_SECONDS // 60} min windows)."
+        )
+    elif trim_silence:
+        if speech_audio is None:
+            print(f"[*] Detecting speech regions: {Path(audio_path).name}")
+            original_audio = load_audio_array(audio_path)
+            original_duration = len(original_audio) / SAMPLE_RATE
+            compact_audio, offset_map = build_speech_only_audio(original_audio)
+            del original_audio
+
+            kept_pct = offset_map.speech_duration / original_duration * 100 if original_duration > 0 else 0
+            print(
+                f"[+] Kept {offset_map.speech_duration:.1f}s of speech out of {original_duration:.1f}s "
+                f"({kept_pct:.0f}%)."
+            )
+        else:
+            compact_audio, offset_map = speech_audio
+
+        total_duration = offset_map.speech_duration
+        if total_duration <= 0:
+            print("[!] No speech detected.")
+            if progress_callback:
+                progress_callback(0, 0)
+            return ""
+        windows = [(0.0, compact_audio)]
+    else:
+        native_audio = read_native_audio(audio_path)
+        if native_audio is not None:
+            # Already decoded in-process: no ffprobe, and the model skips PyAV
+            total_duration = len(native_audio) / SAMPLE_RATE
+            windows = [(0.0, native_audio)]
+        else:
+            # --- Get duration for progress bar ---
+            total_duration = get_audio_duration(audio_path)
+            if total_duration <= 0:
+                print("[!] Could not determine audio duration. Progress bar will be approximate.")
+                total_duration = 1.0
+            windows = [(0.0, audio_path)]
+
+    if progress_callback:
+        progress_callback(0, total_duration)
+
+    def timed_segments():
+        """Yield (segment, start, end, progress_pos) with times on the media timeline."""
+        previous_text = None
+        for window_offset, window_audio in windows:
+            window_map = offset_map
+            if windowed_audio and trim_silence:
+                window_audio, window_map = build_speech_only_audio(window_audio)
+                if window_map.speech_duration <= 0:
+                    continue
+
+            options = {}
+            if batch_size:
+                # The batched pipeline builds its batches from VAD chunks
+                options["batch_size"] = batch_size
+                vad_filter = True
+            else:
+                vad_filter = not trim_silence
+
+            options.update(
+                language="zh",
+                word_timestamps=False,
+                vad_filter=vad_filter,
+                # Carry context across window boundaries
+                initial_prompt=previous_text,
+            )
+            if decode_guard:
+                timed_iter = iter_guarded_segments(
+                    transcriber,
+                    window_audio,
+                    decode_guard,
+                    batched=bool(batch_size),
+                    window_offset=window_offset,
+                    offset_map=window_map,
+                    **options,
+                )
+            else:
+                segments_iter, info = transcriber.transcribe(window_audio, **options)
+                timed_iter = ((seg, seg.start, seg.end) for seg in segments_iter)
+
+            for segment, raw_start, raw_end in timed_iter:
+                seg_start, seg_end = raw_start, raw_end
+                if window_map:
+                    seg_start = window_map.to_original(seg_start)
+                    seg_end = window_map.to_original(seg_end, is_end=True)
+
+                progress_pos = raw_end if speech_progress else window_offset + seg_end
+                if segment.text.strip():
+                    previous_text = segment.text.strip()
+                yield segment, window_offset + seg_start, window_offset + seg_end, progress_pos
+
+            if decode_guard and decode_guard.stopped:
+                return
+
+    # --- Transcribe with progress ---
+    print(f"[*] Transcribing: {Path(audio_path).name}")
+
+    cues = []
 
     progress_bar = None
     if not progress_callback:
@@ -349,35 +1925,20 @@ def transcribe_and_build_srt(
 
     last_pos = 0.0
 
-    for segment in segments_iter:
+    for segment, seg_start, seg_end, progress_pos in timed_segments():
         text = segment.text.strip()
         if not text:
             continue
 
-        progress = int(segment.end) - int(last_pos)
+        progress = int(progress_pos) - int(last_pos)
         if progress > 0:
             if progress_bar:
                 progress_bar.update(progress)
             if progress_callback:
-                progress_callback(segment.end, total_duration)
-            last_pos = segment.end
+                progress_callback(progress_pos, total_duration)
+            last_pos = progress_pos
 
-        lines = split_text_by_chars(text, max_chars)
-        duration = segment.end - segment.start
-        time_per_line = duration / len(lines) if lines else duration
-
-        for i, line in enumerate(lines):
-            start_time = segment.start + (i * time_per_line)
-            end_time = segment.start + ((i + 1) * time_per_line)
-
-            srt_lines.append(f"{subtitle_index}")
-            srt_lines.append(
-                f"{format_timestamp(start_time)} --> {format_timestamp(end_time)}"
-            )
-            srt_lines.append(line)
-            srt_lines.append("")
-
-            subtitle_index += 1
+        cues.extend(build_cues(text, seg_start, seg_end, max_chars))
 
     remaining = int(total_duration) - int(last_pos)
     if remaining > 0:
@@ -389,33 +1950,291 @@ def transcribe_and_build_srt(
     if progress_bar:
         progress_bar.close()
 
-    return "\n".join(srt_lines)
+    if decode_guard:
+        print(decode_guard.summary_line())
+
+    return format_srt(cues)
+
+
+# ---------------------------------------------------------------------------
+# Model Cascade
+# ---------------------------------------------------------------------------
+
+
+def weak_segment_reason(segment, logprob_threshold: float = CASCADE_LOGPROB_THRESHOLD):
+    """Return why a segment should be re-decoded by the larger model, or None."""
+    if segment.avg_logprob < logprob_threshold:
+        return "low_logprob"
+    if segment.compression_ratio > CASCADE_COMPRESSION_THRESHOLD:
+        return "repetitive"
+    if segment.no_speech_prob > CASCADE_NO_SPEECH_THRESHOLD:
+        return "no_speech"
+    return None
+
+
+def merge_time_ranges(ranges: list, pad: float, gap: float, limit: float) -> list:
+    """Pad (start, end) ranges, clamp them to [0, limit] and merge ones closer than gap."""
+    merged = []
+    for start, end in sorted(ranges):
+        start, end = max(start - pad, 0.0), min(end + pad, limit)
+        if merged and start - merged[-1][1] <= gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def transcribe_cascade(
+    audio_path: str,
+    fast_model: TranscriptionEngine,
+    fast_model_name: str,
+    strong_model: TranscriptionEngine,
+    strong_model_name: str,
+    max_chars: int = 40,
+    progress_callback=None,
+    trim_silence: bool = False,
+    batch_size=None,
+    logprob_threshold: float = CASCADE_LOGPROB_THRESHOLD,
+):
+    """
+    Transcribe with fast_model, then re-decode only the weak time ranges with
+    strong_model and splice the results into one SRT.
+
+    progress_callback: function(current_seconds, total_seconds); called for the
+                       fast pass, then again (from 0) for the escalated ranges.
+    Returns: (srt_content, stats) where stats has segment/second counts and
+             the escalated fraction.
+    """
+    from tqdm import tqdm
+
+    print(f"[*] Decoding audio: {Path(audio_path).name}")
+    audio = load_audio_array(audio_path)
+    offset_map = None
+    if trim_silence:
+        audio, offset_map = build_speech_only_audio(audio)
+    total_duration = len(audio) / SAMPLE_RATE
+
+    # --- Pass 1: fast model over everything ---
+    print(f"[*] Cascade pass 1 ({fast_model_name}): full file")
+    fast_transcriber = fast_model
+    options = {}
+    if batch_size:
+        fast_transcriber = get_batched_pipeline(fast_model)
+        options["batch_size"] = resolve_batch_size(batch_size, fast_model_name)
+
+    progress_bar = None
+    if not progress_callback:
+        progress_bar = tqdm(total=int(total_duration), unit="s", desc="Pass 1", ncols=80)
+
+    fast_segments = []
+    weak_ranges = []
+    reasons = {}
+    last_pos = 0
+    if total_duration > 0:
+        segments_iter, _ = fast_transcriber.transcribe(
+            audio, language="zh", word_timestamps=False, vad_filter=True, **options
+        )
+        for segment in segments_iter:
+            if not segment.text.strip():
+                continue
+            fast_segments.append((segment.start, segment.end, segment.text.strip()))
+            reason = weak_segment_reason(segment, logprob_threshold)
+            if reason:
+                weak_ranges.append((segment.start, segment.end))
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+            if int(segment.end) > last_pos:
+                if progress_bar:
+                    progress_bar.update(int(segment.end) - last_pos)
+                if progress_callback:
+                    progress_callback(segment.end, total_duration)
+                last_pos = int(segment.end)
+    if progress_bar:
+        progress_bar.update(max(int(total_duration) - last_pos, 0))
+        progress_bar.close()
+
+    # --- Pass 2: strong model over weak ranges only ---
+    ranges = merge_time_ranges(
+        weak_ranges, CASCADE_PAD_SECONDS, CASCADE_MERGE_GAP_SECONDS, total_duration
+    )
 
+    def fit_range(start, end):
+        # Padding may reach into neighbouring segments that are kept from pass 1;
+        # pull the edges back so no speech is transcribed twice.
+        for seg_start, seg_end, _ in fast_segments:
+            middle = (seg_start + seg_end) / 2
+            if start <= middle < end or seg_end <= start or seg_start >= end:
+                continue
+            if middle < start:
+                start = seg_end
+            else:
+                end = seg_start
+        return start, end
+
+    ranges = [r for r in (fit_range(*r) for r in ranges) if r[1] > r[0]]
+    escalated_seconds = sum(end - start for start, end in ranges)
+
+    strong_segments = []
+    if ranges:
+        print(
+            f"[*] Cascade pass 2 ({strong_model_name}): {len(ranges)} ranges, "
+            f"{escalated_seconds:.1f}s"
+        )
+        iterator = ranges if progress_callback else tqdm(ranges, desc="Pass 2", ncols=80)
+        done = 0.0
+        for start, end in iterator:
+            clip = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            segments_iter, _ = strong_model.transcribe(
+                clip, language="zh", word_timestamps=False, vad_filter=True
+            )
+            for segment in segments_iter:
+                if segment.text.strip():
+                    strong_segments.append(
+                        (start + segment.start, min(start + segment.end, end), segment.text.strip())
+                    )
+            done += end - start
+            if progress_callback:
+                progress_callback(done, escalated_seconds)
+
+    # --- Splice: fast segments outside escalated ranges + strong segments ---
+    def escalated(seg):
+        middle = (seg[0] + seg[1]) / 2
+        return any(start <= middle < end for start, end in ranges)
+
+    merged = sorted(
+        [seg for seg in fast_segments if not escalated(seg)] + strong_segments
+    )
+
+    cues = []
+    for seg_start, seg_end, text in merged:
+        if offset_map:
+            seg_start = offset_map.to_original(seg_start)
+            seg_end = offset_map.to_original(seg_end, is_end=True)
+        cues.extend(build_cues(text, seg_start, seg_end, max_chars))
+
+    speech_seconds = sum(end - start for start, end, _ in fast_segments)
+    stats = {
+        "segments": len(fast_segments),
+        "weak_segments": len(weak_ranges),
+        "weak_reasons": reasons,
+        "ranges": len(ranges),
+        "escalated_seconds": round(escalated_seconds, 2),
+        "speech_seconds": round(speech_seconds, 2),
+        "escalated_fraction": round(escalated_seconds / total_duration, 4) if total_duration else 0.0,
+    }
+    reason_text = ", ".join(f"{k} {v}" for k, v in sorted(reasons.items())) or "none"
+    print(
+        f"[+] Cascade: {len(weak_ranges)}/{len(fast_segments)} segments weak ({reason_text}); "
+        f"escalated {escalated_seconds:.1f}s of {total_duration:.1f}s "
+        f"({stats['escalated_fraction'] * 100:.1f}%) to {strong_model_name}."
+    )
+    return format_srt(cues), stats
 
-def process_file(input_path: Path, model, model_name: str, max_chars: int, progress_callback=None) -> bool:
-    """Process a single audio/video file. Returns True on success."""
+
+def process_file(
+    input_path: Path,
+    model: TranscriptionEngine,
+    model_name: str,
+    max_chars: int,
+    progress_callback=None,
+    trim_silence: bool = False,
+    windowed_audio: bool = False,
+    batch_size=None,
+    cascade=None,
+    guard: bool = False,
+    time_budget: float = None,
+    audio_tracks=False,
+) -> bool:
+    """Process a single audio/video file. Returns True on success.
+
+    cascade: optional (fast_model, fast_model_name). The fast model transcribes
+             the file and `model` re-decodes only its low-confidence segments.
+    audio_tracks: False for the default audio stream, None for every audio
+             track, or a list of track indices / language tags. Selected
+             tracks are extracted in one ffmpeg pass and each gets its own
+             <stem>_<track>_<model>.srt.
+    """
     ext = input_path.suffix.lower()
 
     if ext not in SUPPORTED_EXTENSIONS:
         print(f"[!] Skipping {input_path.name}: unsupported format ({ext})")
         return False
 
+    output_tag = model_name
+    if cascade:
+        fast_model, fast_model_name = cascade
+        output_tag = f"{fast_model_name}+{model_name}"
+
+    def transcribe(audio_file: str) -> str:
+        if cascade:
+            srt_content, _ = transcribe_cascade(
+                audio_file,
+                fast_model,
+                fast_model_name,
+                model,
+                model_name,
+                max_chars=max_chars,
+                progress_callback=progress_callback,
+                trim_silence=trim_silence,
+                batch_size=batch_size,
+            )
+            return srt_content
+        return transcribe_and_build_srt(
+            audio_path=audio_file,
+            model=model,
+            model_name=model_name,
+            max_chars=max_chars,
+            progress_callback=progress_callback,
+            trim_silence=trim_silence,
+            windowed_audio=windowed_audio,
+            batch_size=batch_size,
+            guard=guard,
+            time_budget=time_budget,
+        )
+
+    def write_srt(srt_content: str, label: str = None):
+        parts = [input_path.stem] + ([label] if label else []) + [output_tag]
+        output_path = input_path.parent / f"{'_'.join(parts)}.srt"
+        output_path.write_text(srt_content, encoding="utf-8")
+        print(f"[+] SRT file created: {output_path}")
+
+    if audio_tracks is not False:
+        check_ffmpeg()
+        all_tracks = probe_audio_tracks(str(input_path))
+        tracks = select_audio_tracks(all_tracks, audio_tracks)
+        if not tracks:
+            print(f"[!] Skipping {input_path.name}: no matching audio tracks "
+                  f"({len(all_tracks)} available)")
+            return False
+        # Extracted tracks are 16 kHz mono WAVs, usable by every decode mode
+        temp_dir, track_files = extract_audio_tracks(str(input_path), tracks)
+        try:
+            for track, track_file in zip(tracks, track_files):
+                label = audio_track_label(track, all_tracks)
+                print(f"[*] Audio track {track['index']} ({label})")
+                write_srt(transcribe(track_file), label)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return True
+
     temp_audio = None
     audio_file = str(input_path)
 
-    if ext in VIDEO_EXTENSIONS:
+    if windowed_audio:
+        # The windowed reader needs 16 kHz mono PCM on disk
+        if not is_whisper_ready_wav(input_path):
+            check_ffmpeg()
+            temp_audio = extract_audio_from_video(str(input_path))
+            audio_file = temp_audio
+    # Silence trimming and the cascade decode straight into memory, so no
+    # intermediate WAV is needed
+    elif ext in VIDEO_EXTENSIONS and not (trim_silence or cascade):
         check_ffmpeg()
         temp_audio = extract_audio_from_video(str(input_path))
         audio_file = temp_audio
 
     try:
-        srt_content = transcribe_and_build_srt(
-            audio_path=audio_file,
-            model=model,
-            model_name=model_name,
-            max_chars=max_chars,
-            progress_callback=progress_callback,
-        )
+        srt_content = transcribe(audio_file)
     finally:
         if temp_audio and os.path.exists(temp_audio):
             os.remove(temp_audio)
@@ -423,19 +2242,1605 @@ def process_file(input_path: Path, model, model_name: str, max_chars: int, progr
             if os.path.isdir(temp_dir):
                 os.rmdir(temp_dir)
 
-    output_filename = f"{input_path.stem}_{model_name}.srt"
-    output_path = input_path.parent / output_filename
-    output_path.write_text(srt_content, encoding="utf-8")
-    print(f"[+] SRT file created: {output_path}")
+    write_srt(srt_content)
     return True
 
 
+# ---------------------------------------------------------------------------
+# Model Comparison
+# ---------------------------------------------------------------------------
+# `--model tiny,small,medium` decodes each input and runs VAD once, then hands
+# the same speech-only audio to every model (what vad_filter would otherwise
+# redo per model). Mel features depend on the model (80 vs 128 bins) and are
+# computed inside faster-whisper, so they stay per model.
+
+
+def parse_model_list(value: str) -> list:
+    """argparse type for the main --model: one model or a comma-separated list."""
+    models = [name.strip() for name in value.split(",") if name.strip()]
+    for name in models:
+        if name not in VALID_MODELS:
+            raise argparse.ArgumentTypeError(
+                f"invalid model {name!r} (choose from {', '.join(VALID_MODELS)})"
+            )
+    if not models:
+        raise argparse.ArgumentTypeError("no model given")
+    return list(dict.fromkeys(models))
+
+
+def predicted_model_mb(model_name: str, history: dict = None) -> float:
+    """Expected peak memory of one model: recorded history, else a size-based guess."""
+    history = load_resource_history() if history is None else history
+    entry = history.get(model_name)
+    if entry:
+        return entry["peak_rss_mb"]
+    return MODEL_SIZES_MB.get(model_name, 500) * 2
+
+
+def plan_model_groups(model_names: list, budget_mb: float = None) -> list:
+    """
+    Split models into groups that run concurrently, each group's predicted
+    memory fitting budget_mb. Without a budget every model runs on its own
+    (back-to-back).
+    """
+    if not budget_mb:
+        return [[name] for name in model_names]
+    history = load_resource_history()
+    groups, used = [], 0.0
+    for name in model_names:
+        need = predicted_model_mb(name, history)
+        if groups and used + need <= budget_mb:
+            groups[-1].append(name)
+            used += need
+        else:
+            groups.append([name])
+            used = need
+    return groups
+
+
+def compare_models(
+    input_path: Path,
+    models: dict,
+    max_chars: int,
+    groups: list = None,
+    **transcribe_kwargs,
+) -> list:
+    """
+    Transcribe one file with several models over shared decoded audio and VAD,
+    writing <stem>_<model>.srt for each.
+
+    models: {model_name: loaded engine}, in output order.
+    groups: lists of model names to run concurrently (default: one at a time).
+    Returns rows of dict(model, file, seconds, audio_seconds, cues) plus a
+    first row with model=None timing the shared decode + VAD.
+    """
+    groups = groups or [[name] for name in models]
+
+    print(f"[*] Decoding audio once for {len(models)} models: {input_path.name}")
+    start = time.perf_counter()
+    audio = load_audio_array(str(input_path))
+    audio_seconds = len(audio) / SAMPLE_RATE
+    speech_audio = build_speech_only_audio(audio)
+    del audio
+    prepare_seconds = time.perf_counter() - start
+    print(
+        f"[+] {speech_audio[1].speech_duration:.1f}s of speech out of {audio_seconds:.1f}s "
+        f"({prepare_seconds:.2f}s decode + VAD)."
+    )
+    rows = [dict(model=None, file=str(input_path), seconds=prepare_seconds,
+                 audio_seconds=audio_seconds, cues=0)]
+
+    def run(model_name, quiet):
+        model_start = time.perf_counter()
+        srt_content = transcribe_and_build_srt(
+            audio_path=str(input_path),
+            model=models[model_name],
+            model_name=model_name,
+            max_chars=max_chars,
+            # Concurrent progress bars would overwrite each other
+            progress_callback=(lambda current, total: None) if quiet else None,
+            speech_audio=speech_audio,
+            **transcribe_kwargs,
+        )
+        seconds = time.perf_counter() - model_start
+        output_path = input_path.parent / f"{input_path.stem}_{model_name}.srt"
+        output_path.write_text(srt_content, encoding="utf-8")
+        print(f"[+] SRT file created: {output_path}")
+        return dict(model=model_name, file=str(input_path), seconds=seconds,
+                    audio_seconds=audio_seconds, cues=srt_content.count(" --> "))
+
+    results = {}
+    for group in groups:
+        if len(group) == 1:
+            results[group[0]] = run(group[0], quiet=False)
+            continue
+        print(f"[*] Running concurrently: {', '.join(group)}")
+        with ThreadPoolExecutor(max_workers=len(group)) as pool:
+            futures = {name: pool.submit(run, name, True) for name in group}
+        for name, future in futures.items():
+            results[name] = future.result()
+
+    rows.extend(results[name] for name in models if name in results)
+    return rows
+
+
+def format_comparison_table(rows: list, load_seconds: dict) -> str:
+    """Side-by-side timing of compare_models() rows, summed over all files."""
+    prepare_rows = [r for r in rows if r["model"] is None]
+    # Files are decoded again for each group of models loaded together
+    audio_total = sum({r["file"]: r["audio_seconds"] for r in prepare_rows}.values())
+    prepare_total = sum(r["seconds"] for r in prepare_rows)
+
+    header = f"{'Model':<16} {'Load s':>7} {'Wall s':>8} {'RTF':>7} {'x Realtime':>11} {'Cues':>6}"
+    lines = [header, "-" * len(header)]
+    for model_name, load in load_seconds.items():
+        model_rows = [r for r in rows if r["model"] == model_name]
+        wall = sum(r["seconds"] for r in model_rows)
+        cues = sum(r["cues"] for r in model_rows)
+        rtf = wall / audio_total if audio_total else 0.0
+        realtime = audio_total / wall if wall else 0.0
+        lines.append(
+            f"{model_name:<16} {load:>7.1f} {wall:>8.2f} {rtf:>7.3f} {realtime:>10.1f}x {cues:>6}"
+        )
+    lines.append(
+        f"Shared decode + VAD: {prepare_total:.2f}s for {audio_total:.1f}s of audio "
+        f"({len(prepare_rows)} decodes for {len(load_seconds)} models)"
+    )
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Watch Folder
+# ---------------------------------------------------------------------------
+
+
+def load_watch_state(state_path: Path) -> dict:
+    """Load the processed-files record, or an empty one if missing/corrupt."""
+    import json
+
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        if isinstance(state.get("processed"), dict):
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"processed": {}}
+
+
+def save_watch_state(state_path: Path, state: dict):
+    """Atomically write the processed-files record."""
+    import json
+
+    temp_path = state_path.with_name(state_path.name + ".tmp")
+    temp_path.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, state_path)
+
+
+def file_fingerprint(path: Path, model_name: str):
+    """Identify one version of a file for one model, or None if it vanished."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "model": model_name}
+
+
+class FileStabilityTracker:
+    """
+    Debounces partially copied files: a candidate becomes ready once its size
+    has stayed the same (and non-zero) for settle_seconds.
+    """
+
+    def __init__(self, settle_seconds: float):
+        self.settle_seconds = settle_seconds
+        self.pending = {}  # path -> (last_size, unchanged_since)
+        self.lock = threading.Lock()
+
+    def touch(self, path: Path):
+        """Register a candidate (called from filesystem event threads or scans)."""
+        with self.lock:
+            if path not in self.pending:
+                self.pending[path] = (-1, time.monotonic())
+
+    def pop_ready(self) -> list:
+        """Return (and forget) candidates whose size has settled."""
+        now = time.monotonic()
+        ready = []
+        with self.lock:
+            for path, (last_size, since) in list(self.pending.items()):
+                try:
+                    size = path.stat().st_size
+                except OSError:
+                    del self.pending[path]
+                    continue
+
+                if size != last_size:
+                    self.pending[path] = (size, now)
+                elif size > 0 and now - since >= self.settle_seconds:
+                    del self.pending[path]
+                    ready.append(path)
+        return sorted(ready)
+
+
+def start_event_observer(directory: Path, recursive: bool, on_path):
+    """
+    Start a watchdog observer that calls on_path(Path) for created, modified
+    or moved-in files. Returns the observer, or None if watchdog is missing.
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            target = getattr(event, "dest_path", "") or event.src_path
+            if event.event_type in ("created", "modified", "moved", "closed"):
+                on_path(Path(target))
+
+    observer = Observer()
+    observer.schedule(Handler(), str(directory), recursive=recursive)
+    observer.start()
+    return observer
+
+
+def iter_supported_files(directory: Path, recursive: bool):
+    """Yield supported audio/video files in a folder."""
+    pattern = "**/*" if recursive else "*"
+    for path in directory.glob(pattern):
+        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS:
+            yield path
+
+
+def watch_directory(
+    directory: Path,
+    model,
+    model_name: str,
+    max_chars: int,
+    state_path: Path = None,
+    settle_seconds: float = WATCH_SETTLE_SECONDS,
+    poll_interval: float = WATCH_POLL_INTERVAL,
+    recursive: bool = False,
+    **process_kwargs,
+):
+    """
+    Keep the model resident and convert new files in `directory` as they land.
+    Runs until interrupted (Ctrl+C).
+
+    process_kwargs: extra keyword arguments forwarded to process_file().
+    """
+    directory = Path(directory).resolve()
+    state_path = Path(state_path) if state_path else directory / WATCH_STATE_FILENAME
+    state = load_watch_state(state_path)
+    tracker = FileStabilityTracker(settle_seconds)
+
+    def on_path(path: Path):
+        if path.suffix.lower() in SUPPORTED_EXTENSIONS:
+            tracker.touch(path.resolve())
+
+    def already_processed(path: Path) -> bool:
+        record = state["processed"].get(str(path))
+        fingerprint = file_fingerprint(path, model_name)
+        return bool(record and fingerprint and all(record.get(k) == v for k, v in fingerprint.items()))
+
+    def scan():
+        for path in iter_supported_files(directory, recursive):
+            if not already_processed(path.resolve()):
+                on_path(path)
+
+    observer = start_event_observer(directory, recursive, on_path)
+    if observer:
+        print(f"[*] Watching {directory} (filesystem events)")
+    else:
+        print(f"[*] Watching {directory} (polling every {poll_interval:g}s; "
+              f"install `watchdog` for event-driven mode)")
+
+    # Pick up anything that arrived while we were not running
+    scan()
+    last_scan = time.monotonic()
+
+    try:
+        while True:
+            if not observer and time.monotonic() - last_scan >= poll_interval:
+                scan()
+                last_scan = time.monotonic()
+
+            for path in tracker.pop_ready():
+                if already_processed(path):
+                    continue
+                fingerprint = file_fingerprint(path, model_name)
+                if fingerprint is None:
+                    continue
+
+                print(f"\n[*] New file: {path.name}")
+                try:
+                    success = process_file(path, model, model_name, max_chars, **process_kwargs)
+                except Exception as e:
+                    print(f"[!] Error processing {path.name}: {e}")
+                    success = False
+
+                # Failures are recorded too, so a broken file is not retried
+                # until it is replaced (size or mtime changes).
+                state["processed"][str(path)] = dict(
+                    fingerprint,
+                    success=success,
+                    finished_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                )
+                save_watch_state(state_path, state)
+
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n[*] Stopped watching.")
+    finally:
+        if observer:
+            observer.stop()
+            observer.join(timeout=2.0)
+
+
+# ---------------------------------------------------------------------------
+# Live Streaming
+# ---------------------------------------------------------------------------
+
+
+def open_pcm_stream(source: str, realtime: bool = False, follow: bool = False):
+    """
+    Start ffmpeg decoding `source` to raw 16 kHz mono s16le on stdout.
+
+    source:   file path, URL (e.g. a local RTMP/HTTP relay) or "-" for stdin.
+    realtime: read input at its native rate (replay a file as if it were live).
+    follow:   keep reading a file that is still being written.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if realtime:
+        cmd += ["-re"]
+    if follow:
+        cmd += ["-follow", "1"]
+    cmd += ffmpeg_thread_args()
+    cmd += [
+        "-i", "pipe:0" if source == "-" else str(source),
+        "-vn",
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-ac", "1",
+        "-f", "s16le",
+        "pipe:1",
+    ]
+    if source == "-":
+        cmd.remove("-nostdin")
+
+    return subprocess.Popen(
+        cmd,
+        stdin=sys.stdin.buffer if source == "-" else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+class IncrementalSubtitleWriter:
+    """Appends finalized cues to an SRT or WebVTT file, flushing each one."""
+
+    def __init__(self, path: Path, fmt: str = "srt"):
+        self.path = Path(path)
+        self.fmt = fmt
+        self.index = 1
+        self.file = open(self.path, "w", encoding="utf-8")
+        if fmt == "vtt":
+            self.file.write("WEBVTT\n\n")
+        self.file.flush()
+
+    def write(self, start: float, end: float, text: str):
+        marker = "." if self.fmt == "vtt" else ","
+        if self.fmt == "srt":
+            self.file.write(f"{self.index}\n")
+        self.file.write(
+            f"{format_timestamp(start, marker)} --> {format_timestamp(end, marker)}\n{text}\n\n"
+        )
+        self.file.flush()
+        self.index += 1
+
+    def close(self):
+        self.file.close()
+
+
+class StreamingTranscriber:
+    """
+    Sliding-window transcription of an unbounded audio stream.
+
+    Audio is appended with feed(); every `step` seconds of new audio the
+    buffered window is decoded. Segments that end at least `lookahead`
+    seconds before the end of the buffer are final (later audio can no
+    longer change them); they are returned as cues and their audio is
+    dropped from the buffer. If the buffer reaches max_window without a
+    final segment, all but the last segment are forced out so latency
+    stays bounded.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_chars: int = 40,
+        latency: float = STREAM_DEFAULT_LATENCY,
+        max_window: float = STREAM_MAX_WINDOW_SECONDS,
+    ):
+        import numpy as np
+
+        self.model = model
+        self.max_chars = max_chars
+        self.step = max(latency / 4, 0.5)
+        self.lookahead = max(latency / 2, 1.0)
+        self.max_window = max(max_window, self.lookahead + self.step)
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0  # media time of buffer[0]
+        self.pending_seconds = 0.0  # audio fed since the last decode
+        self.previous_text = None
+
+    @property
+    def buffered_seconds(self) -> float:
+        return len(self.buffer) / SAMPLE_RATE
+
+    @property
+    def media_time(self) -> float:
+        """Media time of the newest sample received."""
+        return self.buffer_start + self.buffered_seconds
+
+    def feed(self, samples):
+        import numpy as np
+
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.pending_seconds += len(samples) / SAMPLE_RATE
+
+    def ready(self) -> bool:
+        return self.pending_seconds >= self.step
+
+    def decode(self, final: bool = False) -> list:
+        """Decode the buffered window. Returns newly finalized cues (start, end, line)."""
+        self.pending_seconds = 0.0
+        buffer_duration = self.buffered_seconds
+        if buffer_duration <= 0:
+            return []
+
+        segments_iter, _ = self.model.transcribe(
+            self.buffer,
+            language="zh",
+            word_timestamps=False,
+            vad_filter=True,
+            condition_on_previous_text=False,
+            initial_prompt=self.previous_text,
+        )
+        segments = [seg for seg in segments_iter if seg.text.strip()]
+
+        if final:
+            finalized = segments
+        else:
+            horizon = buffer_duration - self.lookahead
+            finalized = [seg for seg in segments if seg.end <= horizon]
+            if not finalized and buffer_duration >= self.max_window and segments:
+                finalized = segments[:-1] or segments
+
+        cues = []
+        for seg in finalized:
+            cues.extend(
+                build_cues(
+                    seg.text.strip(),
+                    self.buffer_start + seg.start,
+                    self.buffer_start + seg.end,
+                    self.max_chars,
+                )
+            )
+
+        # --- Slide the window ---
+        if finalized:
+            self.previous_text = finalized[-1].text.strip()
+            cut = finalized[-1].end
+        elif not segments:
+            # Silence: keep only the lookahead tail
+            cut = max(buffer_duration - self.lookahead, 0.0)
+        else:
+            cut = 0.0
+
+        cut_samples = min(int(cut * SAMPLE_RATE), len(self.buffer))
+        self.buffer = self.buffer[cut_samples:]
+        self.buffer_start += cut_samples / SAMPLE_RATE
+        return cues
+
+
+def summarize_latencies(latencies: list) -> str:
+    """One-line summary (count / mean / p50 / p95 / max) of cue emission latencies."""
+    if not latencies:
+        return "no cues emitted"
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+    mean = sum(ordered) / len(ordered)
+    return (
+        f"{len(ordered)} cues, latency mean {mean:.2f}s, p50 {pct(50):.2f}s, "
+        f"p95 {pct(95):.2f}s, max {ordered[-1]:.2f}s"
+    )
+
+
+def transcribe_stream(
+    source: str,
+    model,
+    output_paths: dict,
+    max_chars: int = 40,
+    latency: float = STREAM_DEFAULT_LATENCY,
+    max_window: float = STREAM_MAX_WINDOW_SECONDS,
+    realtime: bool = False,
+    follow: bool = False,
+) -> list:
+    """
+    Transcribe a live source and write cues incrementally as they are finalized.
+
+    output_paths: {"srt": Path, "vtt": Path} (either may be omitted)
+    Returns: per-cue latency in seconds (emission wall time minus the wall
+             time at which the cue's last sample was received).
+    """
+    import numpy as np
+    import queue
+
+    writers = [IncrementalSubtitleWriter(path, fmt) for fmt, path in output_paths.items()]
+    streamer = StreamingTranscriber(model, max_chars, latency, max_window)
+    proc = open_pcm_stream(source, realtime=realtime, follow=follow)
+
+    # A reader thread drains ffmpeg continuously so decoding never stalls a live
+    # input; the bound applies backpressure to sources read faster than real time.
+    chunks = queue.Queue(maxsize=int(2 * max_window / STREAM_READ_SECONDS))
+    read_bytes = int(STREAM_READ_SECONDS * SAMPLE_RATE) * 2
+
+    def reader():
+        while True:
+            data = proc.stdout.read(read_bytes)
+            chunks.put((time.monotonic(), data))
+            if not data:
+                break
+
+    # Keep the tail of ffmpeg's stderr for the error message if it fails
+    # (a bad URL, an unreadable file, a relay that drops)
+    stderr_tail = deque(maxlen=STREAM_STDERR_LINES)
+
+    def drain_stderr():
+        for line in proc.stderr:
+            stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    threading.Thread(target=reader, daemon=True).start()
+    stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+    stderr_thread.start()
+
+    arrivals = []  # (media_time, wall_time) for received audio
+    latencies = []
+    leftover = b""
+
+    def emit(cues):
+        now = time.monotonic()
+        for start, end, text in cues:
+            # Wall time at which audio up to `end` had arrived
+            idx = bisect.bisect_left(arrivals, (end, 0.0))
+            received_at = arrivals[min(idx, len(arrivals) - 1)][1]
+            cue_latency = max(now - received_at, 0.0)
+            latencies.append(cue_latency)
+
+            for writer in writers:
+                writer.write(start, end, text)
+            print(f"[{format_timestamp(start)} --> {format_timestamp(end)}] "
+                  f"(+{cue_latency:.2f}s) {text}")
+
+    print(f"[*] Streaming from: {source} (latency target {latency:g}s)")
+    stopped = False  # ffmpeg was stopped by us (or by Ctrl+C), not by a failure
+    try:
+        while True:
+            received_at, data = chunks.get()
+            if not data:
+                break
+
+            data = leftover + data
+            usable = len(data) - (len(data) % 2)
+            leftover = data[usable:]
+            samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+            streamer.feed(samples)
+            arrivals.append((streamer.media_time, received_at))
+
+            # Decode once caught up with the input, or when the window is full
+            # (sources read faster than real time never leave the queue empty)
+            if streamer.ready() and (chunks.empty() or streamer.buffered_seconds >= streamer.max_window):
+                emit(streamer.decode())
+
+        emit(streamer.decode(final=True))
+    except KeyboardInterrupt:
+        stopped = True
+        print("\n[*] Stream interrupted; flushing pending audio.")
+        emit(streamer.decode(final=True))
+    finally:
+        if proc.poll() is None:
+            stopped = True
+            proc.terminate()
+        proc.wait()
+        stderr_thread.join(timeout=1.0)
+        for writer in writers:
+            writer.close()
+
+    if proc.returncode and not stopped:
+        detail = "\n".join(stderr_tail) or "no error output"
+        raise AudioExtractionError(
+            f"ffmpeg failed reading {source} after {streamer.media_time:.1f}s "
+            f"(exit code {proc.returncode}): {detail}"
+        )
+
+    print(f"[+] Stream ended after {streamer.media_time:.1f}s: {summarize_latencies(latencies)}")
+    for path in output_paths.values():
+        print(f"[+] Subtitles written: {path}")
+    return latencies
+
+
+# ---------------------------------------------------------------------------
+# Shared Work Queue
+# ---------------------------------------------------------------------------
+#
+# <queue_dir>/jobs/<id>.json     one unfinished file to convert (written by `enqueue`)
+# <queue_dir>/leases/<id>.lease  owned by the worker processing it (heartbeat = mtime)
+# <queue_dir>/done/<id>.json     result record of a converted file
+# <queue_dir>/failed/<id>.json   result record of a file that could not be converted
+#
+# Finished jobs leave jobs/, so scans only ever see unfinished work and the
+# counts come from directory listings alone. Claims use O_CREAT|O_EXCL, which
+# is atomic on local filesystems, SMB and NFSv3+.
+
+
+class LeaseLostError(TranscriptionError):
+    """The worker's lease on a queued job expired and was taken over."""
+
+
+def _write_json_atomic(path: Path, data: dict):
+    import json
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def _read_json(path: Path):
+    import json
+
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def default_worker_id() -> str:
+    import socket
+
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """A work queue shared between hosts through a common directory."""
+
+    def __init__(self, queue_dir, worker_id: str = None, lease_seconds: float = QUEUE_LEASE_SECONDS):
+        import socket
+
+        self.root = Path(queue_dir)
+        self.jobs_dir = self.root / "jobs"
+        self.leases_dir = self.root / "leases"
+        self.done_dir = self.root / "done"
+        self.failed_dir = self.root / "failed"
+        for d in (self.jobs_dir, self.leases_dir, self.done_dir, self.failed_dir):
+            d.mkdir(parents=True, exist_ok=True)
+
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        # One clock file per host, shared by its workers, so restarts do not
+        # leave a new file behind each time
+        self.clock_path = self.root / f".clock-{socket.gethostname()}"
+        # Job ids from the last scan of jobs/ not yet tried by this worker
+        self._candidates = []
+
+    @staticmethod
+    def _ids(directory: Path, suffix: str) -> set:
+        with os.scandir(directory) as entries:
+            return {e.name[:-len(suffix)] for e in entries if e.name.endswith(suffix)}
+
+    def _is_finished(self, job_id: str) -> bool:
+        return (
+            (self.done_dir / f"{job_id}.json").exists()
+            or (self.failed_dir / f"{job_id}.json").exists()
+        )
+
+    # --- Producer side ---
+
+    def add(self, paths) -> int:
+        """Enqueue files (by absolute path). Returns how many were new."""
+        import hashlib
+
+        added = 0
+        for path in paths:
+            path = str(Path(path).resolve())
+            job_id = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+            job_file = self.jobs_dir / f"{job_id}.json"
+            if job_file.exists() or self._is_finished(job_id):
+                continue
+            _write_json_atomic(job_file, {"id": job_id, "path": path, "added_at": time.time()})
+            added += 1
+        return added
+
+    def status(self) -> dict:
+        jobs = self._ids(self.jobs_dir, ".json")
+        done = self._ids(self.done_dir, ".json")
+        failed = self._ids(self.failed_dir, ".json")
+        # A job briefly sits in both jobs/ and done/ while it is being finished
+        jobs -= done | failed
+        running = self._ids(self.leases_dir, ".lease") & jobs
+        return {
+            "total": len(jobs) + len(done) + len(failed),
+            "done": len(done) + len(failed),
+            "failed": len(failed),
+            "running": len(running),
+            "pending": len(jobs - running),
+        }
+
+    # --- Worker side ---
+
+    def shared_now(self) -> float:
+        """Current time according to the shared filesystem (avoids clock skew between hosts)."""
+        self.clock_path.touch()
+        return self.clock_path.stat().st_mtime
+
+    def _lease_path(self, job_id: str) -> Path:
+        return self.leases_dir / f"{job_id}.lease"
+
+    def _create_lease(self, job_id: str):
+        import json
+        import uuid
+
+        token = uuid.uuid4().hex
+        try:
+            fd = os.open(self._lease_path(job_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"worker": self.worker_id, "token": token, "claimed_at": time.time()}, f)
+        return token
+
+    def _count_attempt(self, job_id: str) -> int:
+        """Increment and return the job's attempt counter (call only while holding the lease)."""
+        counter = self.leases_dir / f"{job_id}.attempts"
+        try:
+            attempt = int(counter.read_text().strip()) + 1
+        except (OSError, ValueError):
+            attempt = 1
+        counter.write_text(str(attempt))
+        return attempt
+
+    def _lease_expired(self, path: Path) -> bool:
+        try:
+            return self.shared_now() - path.stat().st_mtime >= self.lease_seconds
+        except OSError:
+            return False
+
+    def _reclaim_stale(self, job_id: str):
+        """
+        If the job's lease has expired, take it over.
+        Returns the expired lease record once it has been removed, else None.
+        """
+        lease_path = self._lease_path(job_id)
+        if not self._lease_expired(lease_path):
+            return None
+
+        tombstone = self.leases_dir / f"{job_id}.stale-{self.worker_id}"
+        try:
+            os.rename(lease_path, tombstone)
+        except OSError:
+            return None  # another worker got there first
+
+        # The lease may have been reclaimed and re-created between the check
+        # and the rename; a rename keeps the mtime, so check what we moved
+        if not self._lease_expired(tombstone):
+            try:
+                os.link(tombstone, lease_path)
+            except FileExistsError:
+                pass  # a third worker leased it meanwhile; the moved owner will notice
+            except OSError:
+                os.replace(tombstone, lease_path)
+                return None
+            os.remove(tombstone)
+            return None
+
+        stale = _read_json(tombstone) or {}
+        os.remove(tombstone)
+        return stale
+
+    def claim(self):
+        """
+        Claim the next unfinished job. Returns (job, lease_token) or (None, None).
+        Abandoned leases are reclaimed; jobs that keep killing workers are
+        given up after QUEUE_MAX_ATTEMPTS.
+        """
+        if not self._candidates:
+            self._candidates = sorted(self._ids(self.jobs_dir, ".json"), reverse=True)
+
+        while self._candidates:
+            job_id = self._candidates.pop()
+            job_file = self.jobs_dir / f"{job_id}.json"
+
+            token = self._create_lease(job_id)
+            if token is None:
+                stale = self._reclaim_stale(job_id)
+                if stale is None:
+                    continue
+                print(f"[!] Reclaimed expired lease of {stale.get('worker', '?')} for job {job_id}")
+                token = self._create_lease(job_id)
+                if token is None:
+                    continue
+
+            job = _read_json(job_file)
+            if job is None or self._is_finished(job_id):
+                # Finished while we were looking
+                self._remove_job(job_id)
+                self.release(job_id)
+                continue
+
+            attempt = self._count_attempt(job_id)
+            if attempt > QUEUE_MAX_ATTEMPTS:
+                self.finish(job, token, success=False, error=f"abandoned after {attempt - 1} attempts")
+                continue
+            job["attempt"] = attempt
+            return job, token
+        return None, None
+
+    def holds_lease(self, job_id: str, token: str) -> bool:
+        return (_read_json(self._lease_path(job_id)) or {}).get("token") == token
+
+    def heartbeat(self, job_id: str, token: str) -> bool:
+        """Refresh the lease. Returns False if it was lost (reclaimed by another worker)."""
+        if not self.holds_lease(job_id, token):
+            return False
+        try:
+            os.utime(self._lease_path(job_id))
+            return True
+        except OSError:
+            return False
+
+    def release(self, job_id: str):
+        try:
+            os.remove(self._lease_path(job_id))
+        except OSError:
+            pass
+
+    def _remove_job(self, job_id: str):
+        for path in (self.jobs_dir / f"{job_id}.json", self.leases_dir / f"{job_id}.attempts"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def finish(self, job: dict, token: str, success: bool, **details):
+        """Record the result, move the job out of jobs/ and drop the lease
+        (only if we still own it)."""
+        if not self.holds_lease(job["id"], token):
+            print(f"[!] Lease for job {job['id']} was lost; leaving the result to its new owner.")
+            return
+        _write_json_atomic(
+            (self.done_dir if success else self.failed_dir) / f"{job['id']}.json",
+            dict(
+                id=job["id"],
+                path=job["path"],
+                worker=self.worker_id,
+                attempt=job.get("attempt", 1),
+                success=success,
+                finished_at=time.time(),
+                **details,
+            ),
+        )
+        self._remove_job(job["id"])
+        self.release(job["id"])
+
+
+def run_queue_worker(
+    queue: WorkQueue,
+    model,
+    model_name: str,
+    max_chars: int,
+    heartbeat_seconds: float = QUEUE_HEARTBEAT_SECONDS,
+    poll_interval: float = QUEUE_POLL_INTERVAL,
+    exit_when_empty: bool = False,
+    **process_kwargs,
+) -> int:
+    """
+    Claim and process jobs until interrupted (or until the queue is drained
+    when exit_when_empty is set). Returns the number of jobs processed.
+    """
+    processed = 0
+    print(f"[*] Worker {queue.worker_id} serving queue {queue.root}")
+
+    try:
+        while True:
+            job, token = queue.claim()
+            if job is None:
+                status = queue.status()
+                if exit_when_empty and status["pending"] == 0 and status["running"] == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            path = Path(job["path"])
+            print(f"\n[*] Job {job['id']} (attempt {job['attempt']}): {path.name}")
+
+            stop_heartbeat = threading.Event()
+            lease_lost = threading.Event()
+
+            def beat():
+                while not stop_heartbeat.wait(heartbeat_seconds):
+                    if not queue.heartbeat(job["id"], token):
+                        lease_lost.set()
+                        return
+
+            def check_lease(current, total):
+                # Called as decoding progresses: abandon the job as soon as
+                # another worker owns it, before any SRT is written
+                if lease_lost.is_set():
+                    raise LeaseLostError(f"Lost lease for job {job['id']}")
+
+            beater = threading.Thread(target=beat, daemon=True)
+            beater.start()
+
+            start = time.perf_counter()
+            error = None
+            try:
+                if not path.exists():
+                    raise FileNotFoundError(f"File not found: {path}")
+                success = process_file(
+                    path, model, model_name, max_chars, progress_callback=check_lease, **process_kwargs
+                )
+            except LeaseLostError as e:
+                print(f"[!] {e}; abandoning it to its new owner.")
+                continue
+            except Exception as e:
+                success = False
+                error = str(e)
+                print(f"[!] Error processing {path.name}: {e}")
+            finally:
+                stop_heartbeat.set()
+                beater.join(timeout=1.0)
+
+            if lease_lost.is_set():
+                print(f"[!] Lost lease for job {job['id']}; leaving the result to its new owner.")
+                continue
+            details = {"wall_seconds": round(time.perf_counter() - start, 3), "model": model_name}
+            if error:
+                details["error"] = error
+            queue.finish(job, token, success=success, **details)
+            processed += 1
+    except KeyboardInterrupt:
+        print("\n[*] Worker interrupted.")
+
+    status = queue.status()
+    print(
+        f"[+] Worker {queue.worker_id} processed {processed} jobs. Queue: {status['done']}/"
+        f"{status['total']} done ({status['failed']} failed), {status['running']} running, "
+        f"{status['pending']} pending."
+    )
+    return processed
+
+
+# ---------------------------------------------------------------------------
+# Async API
+# ---------------------------------------------------------------------------
+
+Cue = namedtuple("Cue", "start end text")
+
+
+class AsyncTranscriber:
+    """
+    asyncio interface for services that embed the converter.
+
+        async with AsyncTranscriber("small", workers=2) as transcriber:
+            async for cue in transcriber.cues("talk.mp3"):
+                print(cue.start, cue.end, cue.text)
+            srt = await transcriber.transcribe_srt("meeting.mp4")
+
+    One model is loaded and shared by `workers` decode threads; any number of
+    jobs may wait for a free worker without holding a thread. Cues reach the
+    consumer through a queue of `buffer_cues`, so a slow consumer pauses its
+    decode thread instead of letting results pile up. Cancelling the consuming
+    task, or closing the iterator early (see contextlib.aclosing), stops the
+    decode at the next segment and frees the worker.
+
+    Nothing is printed; failures raise TranscriptionError (or the engine's
+    own exception). Extra keyword arguments are passed to the engine's
+    transcribe() and can be overridden per call.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "medium",
+        workers: int = 1,
+        engine: str = "faster-whisper",
+        max_chars: int = 40,
+        buffer_cues: int = ASYNC_BUFFER_CUES,
+        **transcribe_options,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.model_name = model_name
+        self.workers = workers
+        self.engine_spec = engine
+        self.max_chars = max_chars
+        self.buffer_cues = buffer_cues
+        self.options = dict(language="zh", word_timestamps=False, vad_filter=True)
+        self.options.update(transcribe_options)
+
+        self.engine = None
+        self._executor = None
+        self._slots = None
+        self._start_lock = asyncio.Lock()
+        # (cancelled event, cue queue) of every running cues() job
+        self._active = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Load the model (off the event loop). Called automatically on first use."""
+        async with self._start_lock:
+            if self.engine is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self.engine = await loop.run_in_executor(
+                None,
+                lambda: load_engine(
+                    self.model_name,
+                    self.engine_spec,
+                    on_progress_callback=lambda msg: None,
+                    num_workers=self.workers,
+                ),
+            )
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fwsrt")
+            self._slots = asyncio.Semaphore(self.workers)
+
+    # Queued after the last cue of a job, or when the job is stopped
+    _FINISHED = object()
+
+    @classmethod
+    def _stop_job(cls, cancelled: threading.Event, queue: asyncio.Queue):
+        """Stop a job's decode thread and wake a consumer waiting on its queue."""
+        cancelled.set()
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(cls._FINISHED)
+
+    async def close(self):
+        """Stop running decodes (suspended cues() iterators end early) and
+        release the worker threads."""
+        for cancelled, queue in list(self._active):
+            self._stop_job(cancelled, queue)
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        self.engine = None
+
+    def _decode(self, audio, options: dict, emit, cancelled: threading.Event):
+        """Worker thread: run the engine and hand cues to emit() until cancelled."""
+        segments, _ = self.engine.transcribe(audio, **options)
+        for segment in segments:
+            if cancelled.is_set():
+                return
+            text = segment.text.strip()
+            if not text:
+                continue
+            for start, end, line in build_cues(text, segment.start, segment.end, self.max_chars):
+                emit(Cue(start, end, line))
+
+    async def cues(self, audio, **options):
+        """
+        Async iterator of Cue(start, end, text) for an audio/video path or a
+        16 kHz mono float32 array. Waits for a free worker first.
+        """
+        await self.start()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.buffer_cues)
+        cancelled = threading.Event()
+
+        def emit(item):
+            # Blocks the decode thread while the consumer's queue is full,
+            # giving up as soon as the job is stopped
+            if cancelled.is_set():
+                return
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except FutureTimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return
+
+        def run():
+            try:
+                self._decode(audio, {**self.options, **options}, emit, cancelled)
+            finally:
+                emit(self._FINISHED)
+
+        async with self._slots:
+            job = (cancelled, queue)
+            self._active.add(job)
+            work = loop.run_in_executor(self._executor, run)
+            try:
+                while not cancelled.is_set():
+                    item = await queue.get()
+                    if item is self._FINISHED:
+                        break
+                    yield item
+                await work  # re-raise decode errors
+            finally:
+                self._active.discard(job)
+                # Unblock a pending put, then keep the slot until the thread is done
+                self._stop_job(cancelled, queue)
+                await asyncio.wait({work})
+
+    async def transcribe_srt(self, audio, **options) -> str:
+        """Transcribe a whole file and return SRT content."""
+        return format_srt([cue async for cue in self.cues(audio, **options)])
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 
-def main():
+def add_transcription_arguments(parser, file_options: bool = True, multi_model: bool = False):
+    """Register the options shared by every mode that transcribes audio.
+
+    file_options: also add options that only apply to complete files.
+    multi_model:  --model accepts a comma-separated list (parsed to a list).
+    """
+    if multi_model:
+        parser.add_argument(
+            "--model",
+            default="medium",
+            type=parse_model_list,
+            metavar="MODEL[,MODEL...]",
+            help="Whisper model to use (default: medium). Several comma-separated models "
+                 "are compared on the same decoded audio.",
+        )
+    else:
+        parser.add_argument(
+            "--model",
+            default="medium",
+            choices=VALID_MODELS,
+            help="Whisper model to use (default: medium).",
+        )
+    parser.add_argument(
+        "--max-chars",
+        type=int,
+        default=40,
+        help="Maximum characters per subtitle line (default: 40, minimum: 4).",
+    )
+    parser.add_argument(
+        "--engine",
+        default="faster-whisper",
+        metavar="ENGINE[:opts]",
+        help="Transcription engine (default: faster-whisper). 'synthetic' emits fixed "
+             "segments without a model for pipeline benchmarks, e.g. "
+             "synthetic:rtf=0.05,segment_seconds=4,chars=20.",
+    )
+    placement = parser.add_mutually_exclusive_group()
+    placement.add_argument(
+        "--cpus",
+        type=parse_cpu_list,
+        default=None,
+        metavar="LIST",
+        help="Pin this job to these CPUs (e.g. 0-7,16) and size model/ffmpeg threads to match.",
+    )
+    placement.add_argument(
+        "--cpu-slot",
+        type=parse_cpu_slot,
+        default=None,
+        metavar="K/N",
+        help="Run in slot K (0-based) of N equal CPU groups, for N jobs side by side "
+             "(e.g. 0/4 .. 3/4 on one host).",
+    )
+    if not file_options:
+        return
+    parser.add_argument(
+        "--trim-silence",
+        action="store_true",
+        help="Run VAD first and transcribe only the speech regions (faster on sparse recordings).",
+    )
+    parser.add_argument(
+        "--windowed-audio",
+        action="store_true",
+        help="Read the 16 kHz PCM audio from disk and decode it window by window "
+             "(keeps memory flat for very long recordings).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=parse_batch_size,
+        default=None,
+        metavar="N|auto",
+        help="Decode speech chunks in parallel batches (faster on multi-core CPUs). "
+             "'auto' picks a size from free memory. Default: sequential decoding.",
+    )
+    parser.add_argument(
+        "--audio-tracks",
+        type=parse_audio_tracks,
+        default=False,
+        metavar="all|TRACKS",
+        help="Transcribe several audio tracks of a video into separate SRTs: 'all', or "
+             "indices / language tags such as '0,2' or 'eng,jpn'. Tracks are extracted "
+             "in a single ffmpeg pass. Default: the default audio track only.",
+    )
+    parser.add_argument(
+        "--guard",
+        action="store_true",
+        help="Detect repetition/hallucination loops and runaway windows while decoding "
+             "and re-decode them with cheaper settings.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Per-file wall-clock budget (implies --guard). When spent, the SRT is "
+             "written from what was decoded so far.",
+    )
+
+
+def validate_transcription_args(args):
+    """Exit with a message if the shared transcription options are invalid,
+    then apply the CPU placement options."""
+    if args.max_chars < 4:
+        print("[!] --max-chars must be at least 4.")
+        sys.exit(1)
+    try:
+        engine_name, _ = parse_engine_spec(args.engine)
+    except argparse.ArgumentTypeError as e:
+        print(f"[!] --engine: {e}")
+        sys.exit(1)
+    if engine_name == "synthetic":
+        # Keep synthetic runs out of real output names and resource history
+        args.model = "synthetic"
+
+    cpus = args.cpus
+    if args.cpu_slot:
+        cpus = cpu_slot(*args.cpu_slot)
+    if cpus:
+        try:
+            apply_cpu_placement(cpus)
+        except OSError as e:
+            print(f"[!] Cannot pin to CPUs {format_cpu_list(cpus)}: {e}")
+            sys.exit(1)
+
+
+def process_options_from_args(args) -> dict:
+    """Collect the optional process_file() keyword arguments from parsed CLI args."""
+    return {
+        "trim_silence": args.trim_silence,
+        "windowed_audio": args.windowed_audio,
+        "batch_size": args.batch_size,
+        "guard": args.guard,
+        "time_budget": args.time_budget,
+        "audio_tracks": args.audio_tracks,
+    }
+
+
+def watch_main(argv):
+    """Entry point for `faster_whisper_srt.py watch <dir>`."""
+    parser = argparse.ArgumentParser(
+        prog="faster_whisper_srt.py watch",
+        description="Watch a folder and convert new audio/video files as they arrive.",
+    )
+    parser.add_argument("directory", help="Folder to watch.")
+    add_transcription_arguments(parser)
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Also watch subfolders.",
+    )
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=WATCH_SETTLE_SECONDS,
+        help=f"Seconds a file size must stay unchanged before it is processed "
+             f"(default: {WATCH_SETTLE_SECONDS}).",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=WATCH_POLL_INTERVAL,
+        help=f"Folder scan interval when filesystem events are unavailable "
+             f"(default: {WATCH_POLL_INTERVAL}).",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help=f"Where to record processed files (default: <directory>/{WATCH_STATE_FILENAME}).",
+    )
+    args = parser.parse_args(argv)
+    validate_transcription_args(args)
+
+    directory = Path(args.directory).resolve()
+    if not directory.is_dir():
+        print(f"[!] Not a directory: {directory}")
+        sys.exit(1)
+
+    model = load_engine(args.model, args.engine)
+
+    watch_directory(
+        directory,
+        model,
+        args.model,
+        args.max_chars,
+        state_path=Path(args.state_file) if args.state_file else None,
+        settle_seconds=args.settle_seconds,
+        poll_interval=args.poll_interval,
+        recursive=args.recursive,
+        **process_options_from_args(args),
+    )
+
+
+def stream_main(argv):
+    """Entry point for `faster_whisper_srt.py stream <source>`."""
+    parser = argparse.ArgumentParser(
+        prog="faster_whisper_srt.py stream",
+        description="Transcribe a live stream, pipe or growing file and emit cues incrementally.",
+    )
+    parser.add_argument(
+        "source",
+        help='File, URL (e.g. rtmp://localhost/live/key) or "-" to read from stdin.',
+    )
+    add_transcription_arguments(parser, file_options=False)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=STREAM_DEFAULT_LATENCY,
+        help=f"Target seconds between speech and its cue being written "
+             f"(default: {STREAM_DEFAULT_LATENCY:g}). Lower is faster but less accurate.",
+    )
+    parser.add_argument(
+        "--max-window",
+        type=float,
+        default=STREAM_MAX_WINDOW_SECONDS,
+        help=f"Maximum seconds of audio held for revision (default: {STREAM_MAX_WINDOW_SECONDS:g}).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["srt", "vtt", "both"],
+        default="srt",
+        help="Subtitle format to write (default: srt).",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Output path without extension (default: <stem>_<model> next to a file "
+             "source, or live_<model>_<time> in the current folder).",
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Read the source at its native rate (replay a local file as a live stream).",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading a file that is still being recorded.",
+    )
+    args = parser.parse_args(argv)
+    validate_transcription_args(args)
+
+    if args.output:
+        base = Path(args.output)
+    elif args.source != "-" and Path(args.source).exists():
+        src = Path(args.source).resolve()
+        base = src.parent / f"{src.stem}_{args.model}"
+    else:
+        base = Path(f"live_{args.model}_{time.strftime('%Y%m%d_%H%M%S')}")
+
+    formats = ["srt", "vtt"] if args.format == "both" else [args.format]
+    output_paths = {fmt: base.with_name(f"{base.name}.{fmt}") for fmt in formats}
+
+    check_ffmpeg()
+    model = load_engine(args.model, args.engine)
+
+    transcribe_stream(
+        args.source,
+        model,
+        output_paths,
+        max_chars=args.max_chars,
+        latency=args.latency,
+        max_window=args.max_window,
+        realtime=args.realtime,
+        follow=args.follow,
+    )
+
+
+def enqueue_main(argv):
+    """Entry point for `faster_whisper_srt.py enqueue <queue_dir> <files...>`."""
+    parser = argparse.ArgumentParser(
+        prog="faster_whisper_srt.py enqueue",
+        description="Add files to a shared work queue served by `worker` processes.",
+    )
+    parser.add_argument("queue_dir", help="Shared queue directory (created if missing).")
+    parser.add_argument("input_files", nargs="*", help="Audio/video files to add.")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.queue_dir)
+    paths = []
+    for raw in args.input_files:
+        p = Path(raw).resolve()
+        if not p.exists():
+            print(f"[!] File not found, skipping: {p}")
+        elif p.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            print(f"[!] Skipping {p.name}: unsupported format ({p.suffix.lower()})")
+        else:
+            paths.append(p)
+
+    added = queue.add(paths)
+    status = queue.status()
+    print(
+        f"[+] Added {added} new jobs. Queue: {status['total']} total, {status['pending']} pending, "
+        f"{status['running']} running, {status['done']} done ({status['failed']} failed)."
+    )
+
+
+def worker_main(argv):
+    """Entry point for `faster_whisper_srt.py worker <queue_dir>`."""
+    parser = argparse.ArgumentParser(
+        prog="faster_whisper_srt.py worker",
+        description="Process jobs from a shared work queue (run one per host/core set).",
+    )
+    parser.add_argument("queue_dir", help="Shared queue directory.")
+    add_transcription_arguments(parser)
+    parser.add_argument("--worker-id", default=None, help="Name of this worker (default: <host>-<pid>).")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=QUEUE_LEASE_SECONDS,
+        help=f"Seconds without heartbeat before a job is reclaimed (default: {QUEUE_LEASE_SECONDS:g}).",
+    )
+    parser.add_argument(
+        "--heartbeat-seconds",
+        type=float,
+        default=QUEUE_HEARTBEAT_SECONDS,
+        help=f"Lease refresh interval (default: {QUEUE_HEARTBEAT_SECONDS:g}).",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=QUEUE_POLL_INTERVAL,
+        help=f"Seconds to wait when no job is available (default: {QUEUE_POLL_INTERVAL:g}).",
+    )
+    parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="Exit once no jobs are pending or running instead of waiting for more.",
+    )
+    args = parser.parse_args(argv)
+    validate_transcription_args(args)
+    if args.heartbeat_seconds >= args.lease_seconds:
+        print("[!] --heartbeat-seconds must be shorter than --lease-seconds.")
+        sys.exit(1)
+
+    queue = WorkQueue(args.queue_dir, worker_id=args.worker_id, lease_seconds=args.lease_seconds)
+    model = load_engine(args.model, args.engine)
+
+    run_queue_worker(
+        queue,
+        model,
+        args.model,
+        args.max_chars,
+        heartbeat_seconds=args.heartbeat_seconds,
+        poll_interval=args.poll_interval,
+        exit_when_empty=args.exit_when_empty,
+        **process_options_from_args(args),
+    )
+
+
+def compare_main(args, model_names: list, input_paths: list):
+    """Main-mode run with several --model values: compare the models file by
+    file over shared decoded audio.
+
+    All models stay loaded for the whole run unless --max-rss is set and their
+    predicted memory together exceeds it; then they are loaded, used and freed
+    in groups that fit, and each group decodes the inputs once.
+    """
+    import gc
+
+    # Records use a "models" label so the per-model memory history used by
+    # --max-rss is not skewed by several models sharing one process
+    resource_records = []
+    load_seconds = {}
+    rows = []
+
+    if args.max_rss:
+        resident_groups = plan_model_groups(model_names, args.max_rss)
+        if len(resident_groups) > 1:
+            print(
+                f"[*] Models do not fit --max-rss {args.max_rss:g} MB together; loading in "
+                f"groups: {' | '.join(', '.join(g) for g in resident_groups)}"
+            )
+    else:
+        resident_groups = [list(model_names)]
+
+    transcribe_kwargs = {
+        "batch_size": args.batch_size,
+        "guard": args.guard,
+        "time_budget": args.time_budget,
+    }
+
+    for group in resident_groups:
+        models = {}
+        for model_name in group:
+            if args.max_rss and not admit_job(model_name, args.max_rss):
+                continue
+            with ResourceSampler("load", models=model_name) as usage:
+                models[model_name] = load_engine(model_name, args.engine)
+            resource_records.append(usage.to_dict())
+            load_seconds[model_name] = usage.wall_seconds
+        if not models:
+            continue
+
+        concurrent_groups = None
+        if args.parallel_models:
+            budget = args.max_rss
+            if budget is None:
+                available = read_available_memory()
+                budget = available / MB if available else None
+            concurrent_groups = plan_model_groups(list(models), budget)
+            print(f"[*] Model groups: {' | '.join(', '.join(g) for g in concurrent_groups)}")
+
+        for idx, input_path in enumerate(input_paths, 1):
+            if len(input_paths) > 1:
+                print(f"\n[{idx}/{len(input_paths)}] Processing: {input_path.name}")
+            if input_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                print(f"[!] Skipping {input_path.name}: unsupported format ({input_path.suffix.lower()})")
+                continue
+            with ResourceSampler("compare", models=",".join(models), file=str(input_path)) as usage:
+                rows.extend(compare_models(
+                    input_path, models, args.max_chars, concurrent_groups, **transcribe_kwargs
+                ))
+            resource_records.append(usage.to_dict())
+
+        # Free this group's models before the next group loads
+        models.clear()
+        gc.collect()
+
+    if not load_seconds:
+        sys.exit(1)
+
+    print("\n" + format_comparison_table(rows, load_seconds))
+    print("\n" + format_resource_table(resource_records))
+    if args.metrics_json:
+        write_metrics_json(args.metrics_json, resource_records)
+        print(f"[+] Metrics written: {args.metrics_json}")
+    if args.metrics_prom:
+        write_metrics_prometheus(args.metrics_prom, resource_records)
+        print(f"[+] Metrics written: {args.metrics_prom}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # --- Long-running modes ---
+    subcommands = {
+        "watch": watch_main,
+        "stream": stream_main,
+        "enqueue": enqueue_main,
+        "worker": worker_main,
+    }
+    if argv and argv[0] in subcommands:
+        subcommands[argv[0]](argv[1:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Convert audio/video files to SRT subtitles using faster-whisper.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -445,6 +3850,22 @@ Examples:
   python faster_whisper_srt.py a.mp3 b.mp3 c.mp4
   python faster_whisper_srt.py *.mp3 --model large-v3-turbo
   python faster_whisper_srt.py demo.wav --model medium --max-chars 30
+  python faster_whisper_srt.py lecture.mp4 --trim-silence
+  python faster_whisper_srt.py long_recording.mp3 --windowed-audio
+  python faster_whisper_srt.py movie.mkv --audio-tracks all
+  python faster_whisper_srt.py *.mp3 --max-rss 6000 --metrics-prom job.prom
+  python faster_whisper_srt.py lecture.mp3 --batch-size auto
+  python faster_whisper_srt.py lecture.mp3 --model large-v3 --cascade small
+  python faster_whisper_srt.py lecture.mp3 --model tiny,small,medium --parallel-models
+  python faster_whisper_srt.py noisy.mp3 --guard --time-budget 600
+  python faster_whisper_srt.py *.wav --engine synthetic:rtf=0   (pipeline benchmark, no model)
+  python faster_whisper_srt.py part1.mp3 --cpu-slot 0/4          (4 jobs side by side)
+
+Other modes:
+  python faster_whisper_srt.py watch <dir> [options]   Convert files as they land in <dir>
+  python faster_whisper_srt.py stream <src> [options]  Live subtitles from a stream/pipe/growing file
+  python faster_whisper_srt.py enqueue <queue> <files>  Add files to a shared work queue
+  python faster_whisper_srt.py worker <queue> [options] Process queued files (one per node)
         """,
     )
     parser.add_argument(
@@ -452,27 +3873,63 @@ Examples:
         nargs="+",
         help="One or more audio/video files to convert.",
     )
+    add_transcription_arguments(parser, multi_model=True)
+    parser.add_argument(
+        "--parallel-models",
+        action="store_true",
+        help="With several --model values, run models concurrently as far as the memory "
+             "budget (--max-rss, else free memory) allows. Default: back-to-back.",
+    )
     parser.add_argument(
-        "--model",
-        default="medium",
+        "--cascade",
+        default=None,
         choices=VALID_MODELS,
-        help="Whisper model to use (default: medium).",
+        metavar="FAST_MODEL",
+        help="Transcribe with FAST_MODEL first and re-decode only low-confidence "
+             "segments with --model. Output: <name>_<FAST_MODEL>+<model>.srt",
     )
     parser.add_argument(
-        "--max-chars",
-        type=int,
-        default=40,
-        help="Maximum characters per subtitle line (default: 40, minimum: 4).",
+        "--max-rss",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="Memory budget. Refuse models whose recorded peak RSS exceeds it, "
+             "and wait for free memory before each job.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        default=None,
+        metavar="PATH",
+        help="Write per-job resource usage (RSS, CPU, threads, temp disk) as JSON.",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        default=None,
+        metavar="PATH",
+        help="Write per-job resource usage in Prometheus text format.",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # --- Validate ---
-    if args.max_chars < 4:
-        print("[!] --max-chars must be at least 4.")
-        sys.exit(1)
-
-    check_faster_whisper()
+    model_names = args.model
+    args.model = model_names[0]
+    validate_transcription_args(args)
+    if len(model_names) > 1 and args.model != "synthetic":
+        for option, value in (("--cascade", args.cascade), ("--windowed-audio", args.windowed_audio),
+                              ("--audio-tracks", args.audio_tracks is not False)):
+            if value:
+                print(f"[!] {option} cannot be combined with several --model values.")
+                sys.exit(1)
+    if args.cascade:
+        if args.cascade == args.model:
+            print("[!] --cascade needs a different (faster) model than --model.")
+            sys.exit(1)
+        for option, value in (("--windowed-audio", args.windowed_audio), ("--guard", args.guard),
+                              ("--time-budget", args.time_budget)):
+            if value:
+                print(f"[!] --cascade cannot be combined with {option}.")
+                sys.exit(1)
 
     # --- Collect and validate input files ---
     input_paths = []
@@ -488,16 +3945,47 @@ Examples:
         sys.exit(1)
 
     total_files = len(input_paths)
+    resource_records = []
+
+    if len(model_names) > 1 and args.model != "synthetic":
+        compare_main(args, model_names, input_paths)
+        return
 
     # --- Load model once for all files ---
-    model = load_model_with_progress(args.model)
+    # A cascade keeps both models loaded, so it is admitted as a pair and its
+    # records use a "models" label: the fast model loads into a process that
+    # already holds the strong one, which must not skew the per-model history
+    job_models = [args.cascade, args.model] if args.cascade else [args.model]
+    job_labels = {"models": "+".join(job_models)} if args.cascade else {"model": args.model}
+    if args.max_rss and not admit_job(job_models, args.max_rss):
+        sys.exit(1)
+    with ResourceSampler("load", model=args.model) as usage:
+        model = load_engine(args.model, args.engine)
+    resource_records.append(usage.to_dict())
+
+    cascade = None
+    if args.cascade:
+        with ResourceSampler("load", models=args.cascade) as usage:
+            cascade = (load_engine(args.cascade, args.engine), args.cascade)
+        resource_records.append(usage.to_dict())
 
     # --- Process each file ---
     success_count = 0
     for idx, input_path in enumerate(input_paths, 1):
         if total_files > 1:
             print(f"\n[{idx}/{total_files}] Processing: {input_path.name}")
-        success = process_file(input_path, model, args.model, args.max_chars)
+        if args.max_rss and not admit_job(job_models, args.max_rss):
+            continue
+        with ResourceSampler("transcribe", file=str(input_path), **job_labels) as usage:
+            success = process_file(
+                input_path,
+                model,
+                args.model,
+                args.max_chars,
+                cascade=cascade,
+                **process_options_from_args(args),
+            )
+        resource_records.append(usage.to_dict())
         if success:
             success_count += 1
 
@@ -505,7 +3993,21 @@ Examples:
     if total_files > 1:
         print(f"\n[+] Done! {success_count}/{total_files} files converted successfully.")
 
+    # --- Resource report ---
+    print("\n" + format_resource_table(resource_records))
+    update_resource_history(resource_records)
+    if args.metrics_json:
+        write_metrics_json(args.metrics_json, resource_records)
+        print(f"[+] Metrics written: {args.metrics_json}")
+    if args.metrics_prom:
+        write_metrics_prometheus(args.metrics_prom, resource_records)
+        print(f"[+] Metrics written: {args.metrics_prom}")
+
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except TranscriptionError as e:
+        print(f"[!] {e}")
+        sys.exit(1)
 
@@ -55,7 +55,10 @@ def worker_process(files_to_process, model_name, max_chars, log_queue, progress_
         status_queue.put(f"Loading Model: {model_name}...")
         
         # Load model (Blocking, but can be killed via terminate)
-        model = faster_whisper_srt.load_model_with_progress(model_name, on_progress_callback=on_model_status)
+        with faster_whisper_srt.ResourceSampler("load", model=model_name) as usage:
+            model = faster_whisper_srt.load_engine(model_name, on_progress_callback=on_model_status)
+        log_queue.put(usage.summary_line() + "\n")
+        resource_records = [usage.to_dict()]
         
         total_files = len(files_to_process)
         
@@ -71,18 +74,22 @@ def worker_process(files_to_process, model_name, max_chars, log_queue, progress_
                     pass
 
             try:
-                success = faster_whisper_srt.process_file(
-                    Path(file_path), 
-                    model, 
-                    model_name, 
-                    max_chars,
-                    progress_callback=progress_cb
-                )
+                with faster_whisper_srt.ResourceSampler("transcribe", model=model_name, file=str(file_path)) as usage:
+                    success = faster_whisper_srt.process_file(
+                        Path(file_path), 
+                        model, 
+                        model_name, 
+                        max_chars,
+                        progress_callback=progress_cb
+                    )
+                log_queue.put(usage.summary_line() + "\n")
+                resource_records.append(usage.to_dict())
                 if success:
                     log_queue.put(f"[+] Done: {filename}\n")
             except Exception as e:
                 log_queue.put(f"[!] Error processing {filename}: {e}\n")
 
+        faster_whisper_srt.update_resource_history(resource_records)
         log_queue.put("\n[+] All tasks finished.\n")
         status_queue.put("Finished")
         